@@ -0,0 +1,356 @@
+"""
+In-process HTTP server mimicking the GitHub endpoints used by GitPromptHub:
+repos, contents (JSON and raw media type), commits, recursive trees, compare,
+tarball and raw.githubusercontent downloads with Range support.
+"""
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+from ssprompt.core.prompthub import GitPromptHub
+from ssprompt.utils.githash import blob_sha
+
+API_HOST = "https://api.github.com"
+RAW_HOST = "https://raw.githubusercontent.com"
+
+
+class FakeRepository:
+    """
+    A repository as a list of commits, each a snapshot {path: content}. A commit
+    on another parent than the head rewrites the history, like a force-push.
+    """
+
+    def __init__(self, repo: str, files: Dict[str, bytes]) -> None:
+        self.repo = repo
+        self.commits: List[Tuple[str, Dict[str, bytes]]] = []
+        self.parents: Dict[str, str | None] = {}
+        self._lock = threading.Lock()
+        self._tarballs: Dict[str, bytes] = {}
+        self.commit(files)
+
+    def commit(self, files: Dict[str, bytes], parent: str | None = None) -> str:
+        digest = hashlib.sha1(str(len(self.commits)).encode())
+        for path in sorted(files):
+            digest.update(path.encode() + blob_sha(files[path]).encode())
+        sha = digest.hexdigest()
+        with self._lock:
+            if parent is None and self.commits:
+                parent = self.commits[-1][0]
+            self.parents[sha] = parent
+            self.commits.append((sha, dict(files)))
+        return sha
+
+    def ancestors(self, sha: str) -> List[str]:
+        """sha and its ancestors, newest first"""
+        history = []
+        while sha is not None:
+            history.append(sha)
+            sha = self.parents.get(sha)
+        return history
+
+    @property
+    def head(self) -> Tuple[str, Dict[str, bytes]]:
+        return self.commits[-1]
+
+    def files_at(self, ref: str) -> Dict[str, bytes] | None:
+        if ref in ("main", "HEAD"):
+            return self.head[1]
+        for sha, files in self.commits:
+            if sha == ref:
+                return files
+        return None
+
+    def sha_of(self, ref: str) -> str:
+        return self.head[0] if ref in ("main", "HEAD") else ref
+
+    def tarball(self, ref: str) -> bytes:
+        sha = self.sha_of(ref)
+        with self._lock:
+            if sha in self._tarballs:
+                return self._tarballs[sha]
+        buffer = io.BytesIO()
+        top = f"{self.repo.replace('/', '-')}-{sha[:7]}"
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            for path, content in (self.files_at(sha) or {}).items():
+                info = tarfile.TarInfo(f"{top}/{path}")
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+        with self._lock:
+            self._tarballs[sha] = buffer.getvalue()
+        return self._tarballs[sha]
+
+
+class FakeGitHub:
+    """
+    Serve a FakeRepository on 127.0.0.1 from a background thread. Every request
+    sleeps `latency` seconds first, to model the round trip to GitHub. Failures
+    can be injected with fail().
+    """
+
+    def __init__(self, repository: FakeRepository, latency: float = 0.0) -> None:
+        self.repository = repository
+        self.latency = latency
+        self.requests = 0
+        # [URL 路径片段, 状态码, 剩余次数]
+        self._faults: List[List] = []
+        self._faults_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def endpoints(self) -> Dict[str, str]:
+        """GitPromptHub.platform["github"] pointing at this server"""
+        default = GitPromptHub.__fields__["platform"].default["github"]
+        return {
+            name: url.replace(API_HOST, self.base_url + "/api").replace(
+                RAW_HOST, self.base_url + "/raw"
+            )
+            for name, url in default.items()
+        }
+
+    def fail(self, path: str, status: int = 500, times: int = 1):
+        """Answer the next `times` requests whose URL path contains path with status"""
+        with self._faults_lock:
+            self._faults.append([path, status, times])
+
+    def take_fault(self, url_path: str) -> int | None:
+        with self._faults_lock:
+            for fault in self._faults:
+                if fault[0] in url_path and fault[2] > 0:
+                    fault[2] -= 1
+                    return fault[1]
+        return None
+
+    def hub_class(self) -> type[GitPromptHub]:
+        """A GitPromptHub subclass whose github platform is this server"""
+        endpoints = self.endpoints
+
+        class FakeGitPromptHub(GitPromptHub):
+            platform: Dict[str, Dict] = {"github": endpoints}
+
+        return FakeGitPromptHub
+
+    def start(self) -> FakeGitHub:
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> FakeGitHub:
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def _handler(github: FakeGitHub) -> type[BaseHTTPRequestHandler]:
+    repository = github.repository
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 头部与正文分开写出, 需关闭 Nagle 算法以免与延迟确认叠加出 40ms 停顿
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, status: int, body: bytes, content_type: str, headers=None):
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("X-RateLimit-Remaining", "5000")
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, data, status: int = 200):
+            self.send(status, json.dumps(data).encode(), "application/json")
+
+        def not_found(self):
+            self.send_json({"message": "Not Found"}, 404)
+
+        def do_GET(self):
+            github.requests += 1
+            if github.latency:
+                time.sleep(github.latency)
+            if (status := github.take_fault(unquote(self.path))) is not None:
+                return self.send(status, b"Injected failure", "text/plain")
+            url = urlparse(self.path)
+            parts = [unquote(part) for part in url.path.strip("/").split("/")]
+            if parts[0] == "raw":
+                return self.raw("/".join(parts[1:3]), parts[3], "/".join(parts[4:]))
+            if parts[:2] != ["api", "repos"] or "/".join(parts[2:4]) != repository.repo:
+                return self.not_found()
+
+            rest = parts[4:]
+            query = parse_qs(url.query)
+            if not rest:
+                return self.send_json({"full_name": repository.repo, "default_branch": "main"})
+            if rest[0] == "contents":
+                ref = query.get("ref", ["main"])[0]
+                return self.contents("/".join(rest[1:]), ref)
+            if rest[0] == "commits" and len(rest) == 2:
+                sha = repository.sha_of(rest[1])
+                if "sha" in self.headers.get("Accept", ""):
+                    return self.send(200, sha.encode(), "application/vnd.github.sha")
+                return self.send_json({"sha": sha})
+            if rest[:2] == ["git", "trees"] and len(rest) == 3:
+                return self.tree(rest[2])
+            if rest[0] == "compare" and len(rest) == 2:
+                return self.compare(*rest[1].split("...", 1))
+            if rest[0] == "tarball":
+                return self.send(
+                    200,
+                    repository.tarball(rest[1] if len(rest) > 1 else "main"),
+                    "application/x-gzip",
+                )
+            return self.not_found()
+
+        def raw(self, repo: str, ref: str, path: str):
+            files = repository.files_at(ref) or {}
+            if repo != repository.repo or path not in files:
+                return self.send(404, b"404: Not Found", "text/plain")
+            content = files[path]
+            range_header = self.headers.get("Range")
+            if range_header:
+                start = int(range_header.split("=")[1].split("-")[0])
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    # 与部分 CDN 一样, 范围取自压缩后的内容
+                    content = gzip.compress(content)
+                    return self.send(
+                        206,
+                        content[start:],
+                        "application/octet-stream",
+                        {
+                            "Content-Encoding": "gzip",
+                            "Content-Range": f"bytes {start}-{len(content) - 1}/{len(content)}",
+                        },
+                    )
+                return self.send(
+                    206,
+                    content[start:],
+                    "application/octet-stream",
+                    {"Content-Range": f"bytes {start}-{len(content) - 1}/{len(content)}"},
+                )
+            return self.send(200, content, "application/octet-stream")
+
+        def file_entry(self, path: str, content: bytes) -> Dict:
+            return {
+                "name": path.rsplit("/", 1)[-1],
+                "path": path,
+                "type": "file",
+                "sha": blob_sha(content),
+                "size": len(content),
+                "download_url": f"{github.base_url}/raw/{repository.repo}/main/{quote(path)}",
+            }
+
+        def contents(self, path: str, ref: str):
+            files = repository.files_at(ref) or {}
+            if path in files:
+                if "raw" in self.headers.get("Accept", ""):
+                    return self.send(200, files[path], "application/vnd.github.raw")
+                entry = self.file_entry(path, files[path])
+                entry["encoding"] = "base64"
+                entry["content"] = base64.b64encode(files[path]).decode()
+                return self.send_json(entry)
+
+            prefix = path + "/" if path else ""
+            entries: Dict[str, Dict] = {}
+            for file_path, content in files.items():
+                if not file_path.startswith(prefix):
+                    continue
+                name, _, remainder = file_path[len(prefix) :].partition("/")
+                if remainder:
+                    entries[name] = {
+                        "name": name,
+                        "path": prefix + name,
+                        "type": "dir",
+                        "sha": "0" * 40,
+                        "size": 0,
+                        "download_url": None,
+                    }
+                else:
+                    entries[name] = self.file_entry(file_path, content)
+            if not entries:
+                return self.not_found()
+            return self.send_json(sorted(entries.values(), key=lambda e: e["name"]))
+
+        def tree(self, ref: str):
+            files = repository.files_at(ref)
+            if files is None:
+                return self.not_found()
+            tree = []
+            directories = set()
+            for path, content in files.items():
+                segments = path.split("/")
+                for depth in range(1, len(segments)):
+                    directories.add("/".join(segments[:depth]))
+                tree.append(
+                    {
+                        "path": path,
+                        "mode": "100644",
+                        "type": "blob",
+                        "sha": blob_sha(content),
+                        "size": len(content),
+                    }
+                )
+            for directory in directories:
+                tree.append({"path": directory, "mode": "040000", "type": "tree", "sha": "1" * 40})
+            tree.sort(key=lambda entry: entry["path"])
+            return self.send_json({"sha": ref, "tree": tree, "truncated": False})
+
+        def compare(self, base: str, head: str):
+            base_files, head_files = repository.files_at(base), repository.files_at(head)
+            if base_files is None or head_files is None:
+                return self.not_found()
+            base, head = repository.sha_of(base), repository.sha_of(head)
+            base_history = repository.ancestors(base)
+            # 三点比较: 列出的是合并基础到 head 的变化
+            merge_base = next(
+                (sha for sha in repository.ancestors(head) if sha in base_history), None
+            )
+            if merge_base is None:
+                return self.not_found()
+            if base == head:
+                status = "identical"
+            elif merge_base == base:
+                status = "ahead"
+            elif merge_base == head:
+                status = "behind"
+            else:
+                status = "diverged"
+            base_files = repository.files_at(merge_base)
+            changed = []
+            for path in sorted(set(base_files) | set(head_files)):
+                if path not in head_files:
+                    changed.append({"filename": path, "status": "removed", "sha": blob_sha(base_files[path])})
+                elif path not in base_files:
+                    changed.append({"filename": path, "status": "added", "sha": blob_sha(head_files[path])})
+                elif base_files[path] != head_files[path]:
+                    changed.append({"filename": path, "status": "modified", "sha": blob_sha(head_files[path])})
+            return self.send_json({"status": status, "total_commits": 1, "files": changed})
+
+    return Handler
@@ -0,0 +1,184 @@
+"""
+Benchmark GitPromptHub against the in-process fake GitHub server.
+
+    python -m benchmarks.run --files 10,100,1000 --modes tree,contents,archive \
+        --latency 0.02 --output results.json
+
+Every scenario reports seconds, files per second and the requests the server
+received. With --baseline, scenarios slower than the baseline by more than
+--threshold fail the run, so pull time regressions are caught before release.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# 基准测试不需要进度条输出
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+from benchmarks.fake_github import FakeGitHub, FakeRepository  # noqa: E402
+from benchmarks.synthetic import DEFAULT_PROJECT, synthetic_project  # noqa: E402
+from ssprompt.core.cache import BlobCache  # noqa: E402
+from ssprompt.core.prompthub.git_prompthub import DEFAULT_JOBS  # noqa: E402
+
+REPOSITORY = "bench/PromptHub"
+
+
+def measure(run: Callable[[], Any], server: FakeGitHub) -> Dict[str, float]:
+    requests = server.requests
+    start = time.perf_counter()
+    run()
+    return {
+        "seconds": round(time.perf_counter() - start, 4),
+        "requests": server.requests - requests,
+    }
+
+
+def bench_pulls(
+    server: FakeGitHub, files: int, mode: str, jobs: int, workdir: Path
+) -> List[Dict[str, Any]]:
+    hub_class = server.hub_class()
+
+    def new_hub(path: Path, **kwargs: Any):
+        path.mkdir(parents=True, exist_ok=True)
+        return hub_class(
+            "github", REPOSITORY, DEFAULT_PROJECT, "", path=path, jobs=jobs, mode=mode, **kwargs
+        )
+
+    blob_cache = BlobCache(workdir.joinpath("blobs"), 1 << 40)
+    cold = new_hub(workdir.joinpath("cold"), blob_cache=blob_cache)
+    results = [("pull_cold", measure(cold.pull_project, server))]
+    results.append(("pull_noop", measure(cold.pull_project, server)))
+
+    cached = new_hub(workdir.joinpath("cached"), blob_cache=blob_cache)
+    results.append(("pull_blob_cache", measure(cached.pull_project, server)))
+
+    return [
+        {
+            "scenario": scenario,
+            "files": files,
+            "mode": mode,
+            **result,
+            "files_per_second": round(files / result["seconds"], 1) if result["seconds"] else None,
+        }
+        for scenario, result in results
+    ]
+
+
+def bench_meta(
+    server: FakeGitHub, files: int, iterations: int, workdir: Path
+) -> List[Dict[str, Any]]:
+    hub_class = server.hub_class()
+
+    def new_hub(**kwargs: Any):
+        # 每次使用新的实例, 测量获取与解析 metafile 的完整开销
+        return hub_class("github", REPOSITORY, DEFAULT_PROJECT, "", path=workdir, **kwargs)
+
+    scenarios = {
+        "get_remote_project_meta": lambda: new_hub().get_remote_project_meta(),
+        "get_project_dependencies": lambda: new_hub(types="json").get_project_dependencies(),
+    }
+    results = []
+    for scenario, call in scenarios.items():
+        result = measure(lambda: [call() for _ in range(iterations)], server)
+        results.append(
+            {
+                "scenario": scenario,
+                "files": files,
+                "iterations": iterations,
+                **result,
+                "calls_per_second": round(iterations / result["seconds"], 1) if result["seconds"] else None,
+            }
+        )
+    return results
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float
+) -> List[str]:
+    """Scenarios slower than their baseline by more than threshold"""
+
+    def key(result: Dict[str, Any]):
+        return (result["scenario"], result["files"], result.get("mode"))
+
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(key(result))
+        if before and before["seconds"] and result["seconds"] > before["seconds"] * (1 + threshold):
+            regressions.append(
+                f"{result['scenario']} files={result['files']} mode={result.get('mode')}: "
+                f"{before['seconds']}s -> {result['seconds']}s"
+            )
+    return regressions
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ssprompt pull benchmarks")
+    parser.add_argument("--files", default="10,100,1000", help="file counts, eg. 10,100,1000,10000")
+    parser.add_argument("--modes", default="tree,contents,archive", help="pull modes to measure")
+    parser.add_argument("--depth", type=int, default=3, help="directory depth of the files")
+    parser.add_argument("--min-size", type=int, default=256, help="minimum file size in bytes")
+    parser.add_argument("--max-size", type=int, default=16 * 1024, help="maximum file size in bytes")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every request")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="concurrent downloads")
+    parser.add_argument("--iterations", type=int, default=20, help="calls of the metadata scenarios")
+    parser.add_argument("--output", default="benchmark-results.json", help="JSON results file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown against the baseline, eg. 0.2"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
+    file_counts = [int(count) for count in args.files.split(",")]
+    modes = args.modes.split(",")
+
+    results: List[Dict[str, Any]] = []
+    for files in file_counts:
+        project = synthetic_project(
+            files, depth=args.depth, min_size=args.min_size, max_size=args.max_size
+        )
+        repository = FakeRepository(REPOSITORY, project)
+        with FakeGitHub(repository, args.latency) as server:
+            for mode in modes:
+                with tempfile.TemporaryDirectory(prefix="ssprompt-bench-") as workdir:
+                    results += bench_pulls(server, files, mode, args.jobs, Path(workdir))
+                    print(json.dumps(results[-3:]), file=sys.stderr)
+            with tempfile.TemporaryDirectory(prefix="ssprompt-bench-") as workdir:
+                results += bench_meta(server, files, args.iterations, Path(workdir))
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "parameters": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
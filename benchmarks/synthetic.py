@@ -0,0 +1,60 @@
+"""
+Synthetic Prompt Hub projects for the benchmarks: a metafile plus a given
+number of prompt files spread over nested directories, with reproducible
+sizes and contents.
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict
+
+import yaml
+
+DEFAULT_PROJECT = "bench"
+
+
+def synthetic_project(
+    files: int,
+    depth: int = 3,
+    fanout: int = 8,
+    min_size: int = 256,
+    max_size: int = 16 * 1024,
+    dependencies: int = 3,
+    sub_project: str = DEFAULT_PROJECT,
+    seed: int = 0,
+) -> Dict[str, bytes]:
+    """
+    Files of a sub project laid out as <sub>/json/<sub>/d<i>/.../f<n>.json.
+    Each file sits `depth` directories deep, with up to `fanout` directories
+    per level, and is between min_size and max_size bytes long.
+    """
+    rng = random.Random(seed)
+    meta = {
+        "meta": {
+            "name": sub_project,
+            "version": "0.1.0",
+            "description": "Synthetic benchmark project",
+        },
+        "json_prompt": {
+            "dirname": "json",
+            "list": [
+                {
+                    "name": f"prompt{index}",
+                    "dependencies": {f"bench-package-{index}": "1.0.0"},
+                }
+                for index in range(dependencies)
+            ],
+        },
+    }
+    project = {
+        f"{sub_project}/{sub_project}.yaml": yaml.dump(meta, sort_keys=False).encode()
+    }
+
+    prefix = f"{sub_project}/json/{sub_project}"
+    for index in range(files):
+        directories = "/".join(f"d{rng.randrange(fanout)}" for _ in range(depth))
+        size = rng.randint(min_size, max_size)
+        path = f"{prefix}/{directories}/f{index}.json" if directories else f"{prefix}/f{index}.json"
+        # 任意字节, 同时覆盖二进制与 CRLF 内容的哈希路径
+        project[path] = rng.randbytes(size)
+    return project
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import logging
+from contextlib import suppress
 from importlib import import_module
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from cleo.application import Application as BaseApplication
+from cleo.exceptions import CleoError
 from cleo.events.console_command_event import ConsoleCommandEvent
 from cleo.events.console_events import COMMAND
 from cleo.events.event_dispatcher import EventDispatcher
@@ -18,7 +20,9 @@ from ssprompt.ssprompt import Ssprompt
 if TYPE_CHECKING:
     from collections.abc import Callable
 
+    from cleo.commands.command import Command as BaseCommand
     from cleo.events.event import Event
+    from cleo.io.inputs.definition import Definition
     from cleo.io.inputs.input import Input
     from cleo.io.io import IO
     from cleo.io.outputs.output import Output
@@ -38,6 +42,12 @@ def load_command(name: str) -> Callable[[], Command]:
 COMMANDS = [
     "about",
     "add",
+    "cache clear",
+    "cache info",
+    "cache list",
+    "cache prune",
+    "index search",
+    "index update",
     "init",
     "new",
     "pull",
@@ -102,6 +112,96 @@ class Application(BaseApplication):
 
         return io
 
+    @property
+    def _default_definition(self) -> Definition:
+        from cleo.io.inputs.option import Option
+
+        definition = super()._default_definition
+        definition.add_option(
+            Option(
+                "--profile",
+                flag=True,
+                description=(
+                    "Run the command under cProfile and write the pstats file "
+                    "ssprompt-<command>.prof."
+                ),
+            )
+        )
+        definition.add_option(
+            Option(
+                "--profile-output",
+                flag=False,
+                description=(
+                    "Profile the command and write the pstats file to the given path. "
+                    "Also set by SSPROMPT_PROFILE."
+                ),
+            )
+        )
+        definition.add_option(
+            Option(
+                "--profile-top",
+                flag=False,
+                description="Print the top N functions of the profile by cumulative time.",
+            )
+        )
+        return definition
+
+    def _run_command(self, command: BaseCommand, io: IO) -> int:
+        profile_path, top = self._profile_options(command, io)
+        if profile_path is None:
+            return super()._run_command(command, io)
+
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(super()._run_command, command, io)
+        finally:
+            self._write_profile(profiler, profile_path, top, io)
+
+    def _profile_options(
+        self, command: BaseCommand, io: IO
+    ) -> tuple[str | None, int | None]:
+        # 提前绑定参数以读取全局选项, 参数错误留给命令执行时报告
+        with suppress(CleoError):
+            command.merge_application_definition()
+            io.input.bind(command.definition)
+
+        top = None
+        profile_path = None
+        requested = False
+        with suppress(CleoError):
+            top = io.input.option("profile-top")
+            profile_path = io.input.option("profile-output")
+            requested = io.input.option("profile")
+        if top is not None:
+            if not str(top).isdigit():
+                raise ValueError(
+                    "The profile-top option must be a positive integer. eg. --profile-top 20"
+                )
+            top = int(top)
+
+        profile_path = profile_path or self.ssprompt.profile_path
+        if not profile_path and (requested or top is not None):
+            profile_path = f"ssprompt-{command.name.replace(' ', '-')}.prof"
+        return profile_path or None, top
+
+    def _write_profile(
+        self, profiler: Any, profile_path: str, top: int | None, io: IO
+    ) -> None:
+        import io as std_io
+        import pstats
+
+        from cleo.io.outputs.output import Type
+
+        profiler.dump_stats(profile_path)
+        io.write_error_line(f"<comment>Profile written to {profile_path}</comment>")
+        if top:
+            stream = std_io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+            # 函数名中可能含有 <module> 等, 原样输出避免被当作样式标签
+            io.error_output.write(stream.getvalue(), type=Type.RAW)
+
     def register_command_loggers(
         self, event: Event, event_name: str, _: EventDispatcher
     ) -> None:
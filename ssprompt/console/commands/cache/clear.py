@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from ssprompt.console.commands.cache.command import CacheCommand
+from ssprompt.core.cache import format_size
+
+
+class CacheClearCommand(CacheCommand):
+    name = "cache clear"
+    description = "Removes every entry of the local caches"
+
+    help = """\
+The <c1>cache clear</c1> command empties the selected cache, or all caches.
+"""
+
+    def handle(self) -> int:
+        caches = self.caches()
+        if not self.confirm(f"Remove every entry of the {', '.join(caches)} caches?", True):
+            return 0
+
+        for name, cache in caches.items():
+            removed, freed = cache.clear()
+            self.line(
+                f"<info>{name}</info>: removed {removed} entries, {format_size(freed)} freed"
+            )
+        return 0
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import time
+from typing import Dict
+
+from cleo.helpers import argument
+
+from ssprompt.console.commands.command import Command
+from ssprompt.core.cache import FileCache
+
+
+class CacheCommand(Command):
+    arguments = [
+        argument(
+            "cache",
+            "The cache to use, option: [blobs http pypi]. All caches by default",
+            optional=True,
+        )
+    ]
+
+    def caches(self) -> Dict[str, FileCache]:
+        caches = self.ssprompt.caches
+        name = self.argument("cache")
+        if name is None:
+            return caches
+        if name not in caches:
+            raise ValueError(f"The cache '{name}' does not exist, option: {list(caches)}")
+        return {name: caches[name]}
+
+    @staticmethod
+    def format_time(timestamp: float) -> str:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from ssprompt.console.commands.cache.command import CacheCommand
+from ssprompt.core.cache import BlobCache, format_size, last_used
+
+
+class CacheInfoCommand(CacheCommand):
+    name = "cache info"
+    description = "Shows the location, entries and size of the local caches"
+
+    help = """\
+The <c1>cache info</c1> command shows the local caches: downloaded blobs, GitHub \
+API responses and PyPI package metadata.
+"""
+
+    def handle(self) -> int:
+        for name, cache in self.caches().items():
+            entries = cache.entries()
+            size = sum(stat.st_size for _, stat in entries)
+            limit = (
+                f" of {format_size(cache.max_size)}" if isinstance(cache, BlobCache) else ""
+            )
+            self.line(f"<info>{name}</info>: <comment>{cache.path}</comment>")
+            self.line(f"  entries: {len(entries)}, size: {format_size(size)}{limit}")
+            if entries:
+                accessed = [last_used(stat) for _, stat in entries]
+                self.line(
+                    f"  last access: {self.format_time(min(accessed))} "
+                    f"to {self.format_time(max(accessed))}"
+                )
+        return 0
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import os
+
+from ssprompt.console.commands.cache.command import CacheCommand
+from ssprompt.core.cache import HttpCache, format_size, last_used
+
+
+class CacheListCommand(CacheCommand):
+    name = "cache list"
+    description = "Lists the entries of the local caches, most recently used first"
+
+    help = """\
+The <c1>cache list</c1> command lists every cache entry with its size and last \
+access time. Cached responses also show their URL.
+"""
+
+    def handle(self) -> int:
+        for name, cache in self.caches().items():
+            entries = sorted(cache.entries(), key=lambda entry: -last_used(entry[1]))
+            for path, stat in entries:
+                url = HttpCache.url_of(path) if isinstance(cache, HttpCache) else ""
+                self.line(
+                    f"<info>{name}</info> {os.path.basename(path)} "
+                    f"{format_size(stat.st_size):>7} {self.format_time(last_used(stat))}"
+                    + (f" <comment>{url}</comment>" if url else "")
+                )
+        return 0
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from cleo.helpers import option
+
+from ssprompt.console.commands.cache.command import CacheCommand
+from ssprompt.core.cache import evict_lru, format_size, parse_duration, parse_size
+
+
+class CachePruneCommand(CacheCommand):
+    name = "cache prune"
+    description = "Removes the least recently used entries of the local caches"
+
+    options = [
+        option(
+            "max-size",
+            None,
+            "Remove the least recently used entries until the caches fit the size. eg. 500M",
+            flag=False,
+        ),
+        option(
+            "older-than",
+            None,
+            "Remove the entries not used for the duration. eg. 30m, 12h, 7d, 2w",
+            flag=False,
+        ),
+    ]
+
+    help = """\
+The <c1>cache prune</c1> command evicts cache entries by last access time. With both \
+options, entries older than <c1>--older-than</c1> are removed first, then the oldest \
+ones until the selected caches together fit <c1>--max-size</c1>.
+
+Entries used by another ssprompt process while pruning are kept, and a process that \
+is reading an entry keeps reading it after it is removed.
+"""
+
+    def handle(self) -> int:
+        max_size = self.option("max-size")
+        older_than = self.option("older-than")
+        if max_size is None and older_than is None:
+            raise ValueError(
+                "Set --max-size or --older-than. eg. ssprompt cache prune --max-size 500M"
+            )
+
+        removed, freed = evict_lru(
+            self.caches().values(),
+            max_size=parse_size(max_size) if max_size is not None else None,
+            older_than=parse_duration(older_than) if older_than is not None else None,
+        )
+        self.line(f"<info>Removed {removed} entries, {format_size(freed)} freed</info>")
+        return 0
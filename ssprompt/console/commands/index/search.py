@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from cleo.helpers import argument, option
+
+from ssprompt.console.commands.command import Command
+from ssprompt.core.prompthub.index import PromptIndex
+
+
+class IndexSearchCommand(Command):
+    name = "index search"
+    description = "Search the sub projects in the local Prompt Hub index"
+
+    arguments = [
+        argument(
+            "query",
+            "Words to find in the name, description, tags or LLMs. All projects by default",
+            optional=True,
+            multiple=True,
+        )
+    ]
+    options = [
+        option(
+            "project",
+            "m",
+            "Only search the sub projects of the main project. eg. ptonlix/PromptHub",
+            flag=False,
+        ),
+        option("limit", None, "The maximum number of results", flag=False),
+    ]
+    help = """\
+The <c1>index search</c1> command searches the index built by <c1>index update</c1>, \
+without accessing the network.
+"""
+
+    def handle(self) -> int:
+        limit = self.option("limit")
+        if limit is not None and (not str(limit).isdigit() or int(limit) < 1):
+            raise ValueError("The limit option must be a positive integer. eg. --limit 20")
+
+        with PromptIndex(self.ssprompt.index_path) as index:
+            results = index.search(
+                " ".join(self.argument("query") or []),
+                self.option("project"),
+                int(limit) if limit else None,
+            )
+
+        if not results:
+            self.line(
+                "<comment>No Prompt project found, run <c1>ssprompt index update</c1> "
+                "to refresh the index</comment>"
+            )
+            return 0
+
+        for project in results:
+            details = [project["types"], project["tags"], project["llms"]]
+            self.line(
+                f"<info>{project['main_project']}</info> <c1>{project['sub_project']}</c1> "
+                f"{project['version']}  {project['description']}"
+            )
+            if extra := "  ".join(detail for detail in details if detail):
+                self.line(f"    <comment>{extra}</comment>")
+        return 0
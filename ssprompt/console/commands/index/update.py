@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from cleo.helpers import option
+
+from ssprompt.console.commands.command import Command
+from ssprompt.core.prompthub import GitPromptHub, LocalGitPromptHub
+from ssprompt.core.prompthub.git_prompthub import DEFAULT_JOBS
+from ssprompt.core.prompthub.index import PromptIndex
+
+
+class IndexUpdateCommand(Command):
+    name = "index update"
+    description = "Update the local index of the Prompt Hub sub projects"
+
+    options = [
+        option(
+            "project",
+            "m",
+            "Set the prompt main project name. eg. ptonlix/PromptHub",
+            flag=False,
+            default="ptonlix/PromptHub",
+        ),
+        option(
+            "platform",
+            None,
+            "Choose Prompt Engineering Warehouse Platform. option: [github gitee local]",
+            flag=False,
+            default="github",
+        ),
+        option(
+            "mirror",
+            None,
+            "The path of the local Prompt Hub mirror, used with --platform local",
+            flag=False,
+        ),
+        option(
+            "jobs",
+            "j",
+            "The number of metafiles to fetch concurrently",
+            flag=False,
+            default=str(DEFAULT_JOBS),
+        ),
+        option("no-cache", None, "Do not use the local HTTP cache", flag=True),
+    ]
+    help = """\
+The <c1>index update</c1> command fetches the metafile of every sub project of a \
+Prompt Hub, validates it and stores it in the local index searched by \
+<c1>index search</c1>. Only the metafiles whose blob SHA changed since the last \
+update are fetched again.
+"""
+
+    loggers = ["ssprompt.core.prompthub.index"]
+
+    def handle(self) -> int:
+        main_pro = self.option("project")
+        jobs = self.option("jobs")
+        if not str(jobs).isdigit() or int(jobs) < 1:
+            raise ValueError("The jobs option must be a positive integer. eg. -j 8")
+
+        prompthub: GitPromptHub
+        if self.option("platform") == "local":
+            mirror = self.option("mirror") or self.ssprompt.local_mirror
+            if not mirror:
+                raise ValueError(
+                    "The local platform needs a Prompt Hub mirror. eg. --mirror /srv/PromptHub.git"
+                )
+            prompthub = LocalGitPromptHub(main_pro, "", Path(mirror), jobs=int(jobs))
+        else:
+            prompthub = GitPromptHub(
+                self.option("platform"),
+                main_pro,
+                "",
+                self.ssprompt.github_access_key,
+                jobs=int(jobs),
+                http_cache=None if self.option("no-cache") else self.ssprompt.http_cache,
+                transport=self.ssprompt.transport,
+            )
+
+        with PromptIndex(self.ssprompt.index_path) as index:
+            result = index.update(prompthub)
+
+        commit = f" at commit {result.commit[:7]}" if result.commit else ""
+        self.line(
+            f"<info>Indexed {main_pro}{commit}</info>: {len(result.added)} added, "
+            f"{len(result.updated)} updated, {len(result.removed)} removed, "
+            f"{result.unchanged} unchanged"
+        )
+        for sub_project, error in result.invalid.items():
+            self.line(f"<warning>Invalid metafile of {sub_project}: {error}</warning>")
+        for sub_project in result.failed:
+            self.line_error(f"<error>Failed to fetch the metafile of {sub_project}</error>")
+        return 1 if result.failed else 0
@@ -307,6 +307,8 @@ You can specify a package in the following forms:
 
     def _get_repository(self) -> AbstractRepository:
         if self._repository is None:
-            self._repository = PyPiRepository()
+            self._repository = PyPiRepository(
+                transport=self.ssprompt.transport, http_cache=self.ssprompt.pypi_cache
+            )
 
         return self._repository
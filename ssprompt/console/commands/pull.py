@@ -1,12 +1,23 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from pathlib import Path
+from typing import Any, Dict, List
 
 from cleo.helpers import argument, option
 
 from ssprompt.console.commands.command import Command
 from ssprompt.repositories import PyPiRepository
-from ssprompt.core.prompthub import AbstractPromptHub, GitPromptHub
+from ssprompt.core.cache import BlobCache, HttpCache, evict_lru, format_size
+from ssprompt.core.prompthub import (
+    AbstractPromptHub,
+    CloneGitPromptHub,
+    GitPromptHub,
+    LocalGitPromptHub,
+)
+from ssprompt.core.prompthub.batch import BatchPull, PullList
+from ssprompt.core.prompthub.plan import PullPlan
+from ssprompt.core.prompthub.stats import PullStats
+from ssprompt.core.prompthub.git_prompthub import DEFAULT_JOBS
 
 
 class PullCommand(Command):
@@ -39,10 +50,16 @@ class PullCommand(Command):
         option(
             "platform",
             None,
-            "Choose Prompt Engineering Warehouse Platform. option: [github gitee]",
+            "Choose Prompt Engineering Warehouse Platform. option: [github gitee local]",
             flag=False,
             default="github",
         ),
+        option(
+            "mirror",
+            None,
+            "The path of the local Prompt Hub mirror, used with --platform local",
+            flag=False,
+        ),
         option(
             "types",
             "t",
@@ -62,16 +79,77 @@ class PullCommand(Command):
             flag=False,
             default="on",
         ),
+        option(
+            "jobs",
+            "j",
+            "The number of files to download concurrently",
+            flag=False,
+            default=str(DEFAULT_JOBS),
+        ),
+        option(
+            "mode",
+            None,
+            "How to pull the remote project. option: [auto tree contents archive clone]",
+            flag=False,
+            default="auto",
+        ),
+        option("no-cache", None, "Do not use the local download caches", flag=True),
+        option(
+            "offline",
+            None,
+            "Pull only from the blob cache and the cached listings, without network access",
+            flag=True,
+        ),
+        option(
+            "from",
+            None,
+            "Pull every project listed in a pull list file. eg. --from prompts.yaml",
+            flag=False,
+        ),
+        option(
+            "dry-run",
+            None,
+            "Print the files the pull would download, skip and delete, without downloading",
+            flag=True,
+        ),
+        option(
+            "stats",
+            None,
+            "Print a pull report: phase timings, files, bytes, requests and the slowest files",
+            flag=True,
+        ),
+        option(
+            "stats-json",
+            None,
+            "Write the pull report, or the --dry-run plans, as JSON to the given file",
+            flag=False,
+        ),
     ]
     help = """\
 The <c1> pull</c1> command pull the prompt engineering project from remote Prompt Hub \
 in the current directory.
+
+With <c1>--from</c1> every project of a pull list is pulled in one run, sharing the \
+download workers, connections and progress bar:
+
+  project: ptonlix/PromptHub
+  prompts:
+    - subproject: example
+      types: json
+      path: prompts
+
+With <c1>--dry-run</c1> only the remote listing is fetched and compared with the local \
+files, to show what the pull would download, skip and delete and how many bytes it \
+would transfer. Add <c1>-v</c1> to list every file.
+
+With <c1>--offline</c1> the project is restored from the local caches only: the commit, \
+tree listing and metafile cached by an earlier online pull, and the blob cache. The pull \
+fails before changing any file if a blob is missing. An online pull into an empty \
+directory caches everything an offline pull of the same project needs.
 """
     loggers = ["ssprompt.core.vcs.git"]
 
     def handle(self) -> int:
-        from pathlib import Path
-
         path = Path(self.argument("path"))
         if not path.is_absolute():
             # we do not use resolve here due to compatibility issues
@@ -88,20 +166,90 @@ in the current directory.
 
         dirflag = False if dirswitch == "off" else True
 
-        gitprompthub = GitPromptHub(
-            repo_type,
-            main_pro,
-            sub_pro,
-            self.ssprompt.github_access_key,
-            types,
-            typedir,
-            path,
-            dirflag,
-        )
+        jobs = self.option("jobs")
+        if not str(jobs).isdigit() or int(jobs) < 1:
+            raise ValueError("The jobs option must be a positive integer. eg. -j 8")
+
+        offline = self.option("offline")
+        if offline and self.option("no-cache"):
+            raise ValueError(
+                "The offline mode pulls from the local caches, it can't be used with --no-cache"
+            )
+        if offline and self.option("mode") == "clone":
+            raise ValueError(
+                "The clone mode needs network access, it can't be used with --offline"
+            )
+
+        blob_cache = None
+        http_cache = None
+        if not self.option("no-cache"):
+            blob_cache = self.ssprompt.blob_cache
+            http_cache = self.ssprompt.http_cache
+
+        cache_kwargs = {"blob_cache": blob_cache, "http_cache": http_cache}
+        pull_from = self.option("from")
+        if pull_from:
+            pull_list = PullList.load(Path(pull_from).absolute(), main_pro)
+            if not pull_list.prompts:
+                raise ValueError(f"The pull list '{pull_from}' has no projects")
+            with BatchPull(int(jobs)) as batch:
+                prompthubs = [
+                    self.build_prompthub(
+                        entry.project,
+                        entry.subproject,
+                        entry.types,
+                        entry.typedir,
+                        entry.path,
+                        entry.dirflag,
+                        int(jobs),
+                        **cache_kwargs,
+                        **batch.shared,
+                    )
+                    for entry in pull_list.prompts
+                ]
+                try:
+                    if self.option("dry-run"):
+                        return self.show_plans(prompthubs)
+                    depend_list, failures = batch.run(prompthubs)
+                finally:
+                    self.close_prompthubs(prompthubs)
+            request_stats = batch.scheduler.stats
+            pull_stats = batch.stats
+        else:
+            pull_stats = PullStats()
+            gitprompthub = self.build_prompthub(
+                main_pro,
+                sub_pro,
+                types,
+                typedir,
+                path,
+                dirflag,
+                int(jobs),
+                **cache_kwargs,
+                stats=pull_stats,
+            )
+            try:
+                if self.option("dry-run"):
+                    return self.show_plans([gitprompthub])
+                depend_list = self.exec_prompt_hub(gitprompthub)
+            finally:
+                self.close_prompthubs([gitprompthub])
+            failures = {}
+            request_stats = gitprompthub.request_stats
+
+        if not self.option("no-cache") and not offline:
+            # 所有本地缓存共同受大小上限约束, 离线时保留缓存的目录和元数据
+            evict_lru(self.ssprompt.caches.values(), self.ssprompt.cache_max_size)
 
-        depend_list = self.exec_prompt_hub(gitprompthub)
+        if repo_type != "local" and self.option("mode") != "clone" and not offline:
+            self.line(
+                f"<comment>{request_stats['api_calls']} API calls used, "
+                f"{request_stats['not_modified']} not modified, "
+                f"{request_stats['retries']} retries</comment>"
+            )
 
-        no_install_depend_list = self.check_no_install_package(depend_list)
+        with pull_stats.phase("dependencies"):
+            no_install_depend_list = self.check_no_install_package(depend_list)
 
         if no_install_depend_list:
             self.line(
@@ -115,27 +263,200 @@ in the current directory.
             help_message = """\
 Download these dependency packages locally through pip
 """
-            if self.confirm(question_text, True):
+            if offline:
+                self.line("<warning>The packages can't be installed in the offline mode</warning>")
+            elif self.confirm(question_text, True):
                 if self.io.is_interactive():
                     self.line(help_message)
-                    self.install_package(no_install_depend_list)
+                    with pull_stats.phase("install"):
+                        self.install_package(no_install_depend_list)
                 if self.io.is_interactive():
                     self.line("")
 
+        if self.option("stats") or self.option("stats-json"):
+            self.write_stats(pull_stats.report(request_stats))
+
+        if failures:
+            for project in failures:
+                self.line_error(f"<error>Failed to pull the {project} Prompt Project</error>")
+            return 1
+
         self.add_style("fire", fg="red", bg="blue", options=["bold", "blink"])
-        self.line(
-            f"<info> The <fire>{main_pro} {sub_pro} </fire> Prompt Project pull completed, enjoy AI!</info>"
+        if pull_from:
+            self.line(
+                f"<info> The <fire>{len(pull_list.prompts)}</fire> Prompt Projects of {pull_from} pull completed, enjoy AI!</info>"
+            )
+        else:
+            self.line(
+                f"<info> The <fire>{main_pro} {sub_pro} </fire> Prompt Project pull completed, enjoy AI!</info>"
+            )
+
+        return 0
+
+    def build_prompthub(
+        self,
+        main_pro: str,
+        sub_pro: str,
+        types: str,
+        typedir: str,
+        path: Path,
+        dirflag: bool,
+        jobs: int,
+        blob_cache: BlobCache | None = None,
+        http_cache: HttpCache | None = None,
+        **shared: Any,
+    ) -> GitPromptHub:
+        repo_type = self.option("platform")
+        if repo_type == "local":
+            mirror = self.option("mirror") or self.ssprompt.local_mirror
+            if not mirror:
+                raise ValueError(
+                    "The local platform needs a Prompt Hub mirror. eg. --mirror /srv/PromptHub.git"
+                )
+            return LocalGitPromptHub(
+                main_pro,
+                sub_pro,
+                Path(mirror),
+                types,
+                typedir,
+                path,
+                dirflag,
+                jobs,
+                blob_cache=blob_cache,
+                **shared,
+            )
+        if self.option("mode") == "clone":
+            return CloneGitPromptHub(
+                repo_type,
+                main_pro,
+                sub_pro,
+                self.ssprompt.github_access_key,
+                types,
+                typedir,
+                path,
+                dirflag,
+                jobs,
+                blob_cache=blob_cache,
+                **shared,
+            )
+        return GitPromptHub(
+            repo_type,
+            main_pro,
+            sub_pro,
+            self.ssprompt.github_access_key,
+            types,
+            typedir,
+            path,
+            dirflag,
+            jobs,
+            self.option("mode"),
+            blob_cache=blob_cache,
+            http_cache=http_cache,
+            transport=self.ssprompt.transport,
+            offline=self.option("offline"),
+            **shared,
         )
 
+    def show_plans(self, prompthubs: List[GitPromptHub]) -> int:
+        reports = {}
+        for prompthub in prompthubs:
+            project = BatchPull.label(prompthub)
+            plan = prompthub.plan_pull()
+            reports[project] = plan.report()
+            self.write_plan(project, plan)
+
+        if stats_json := self.option("stats-json"):
+            import json
+
+            with open(stats_json, "w") as file:
+                json.dump(reports, file, indent=2)
         return 0
 
+    def write_plan(self, project: str, plan: PullPlan):
+        report = plan.report()
+        download = report["download"]
+        commit = f", commit {plan.commit[:7]}" if plan.commit else ""
+        self.line(f"<info>Pull plan of {project}</info> ({plan.method} mode{commit})")
+
+        details = []
+        if download["cached"]:
+            details.append(f"{download['cached']} from the blob cache")
+        if download["replace"]:
+            details.append(f"{download['replace']} replacing local files")
+        if download["unknown_sizes"]:
+            details.append(f"{download['unknown_sizes']} of unknown size")
+        self.line(
+            f"  download: {download['files']} files, {format_size(download['bytes'])}"
+            + "".join(f", {detail}" for detail in details)
+        )
+        self.line(
+            f"  skip: {report['skip']['files']} files, {format_size(report['skip']['bytes'])}"
+        )
+        self.line(
+            f"  delete: {report['delete']['files']} files, "
+            f"{format_size(report['delete']['bytes'])}"
+        )
+        if plan.method == "archive":
+            self.line("  transfer: the repository archive")
+        else:
+            self.line(f"  transfer: {format_size(report['transfer_bytes'])}")
+
+        if self.io.is_verbose():
+            for item in sorted(plan.download, key=lambda item: item["path"]):
+                mark = "~" if item["path"] in plan.replace else "+"
+                size = format_size(item["size"]) if item["size"] is not None else "?"
+                self.line(f"    {mark} {item['path']} ({size})")
+            for path in report["delete"]["paths"]:
+                self.line(f"    - {path}")
+
+    def write_stats(self, report: Dict[str, Any]):
+        if stats_json := self.option("stats-json"):
+            import json
+
+            with open(stats_json, "w") as file:
+                json.dump(report, file, indent=2)
+        if not self.option("stats"):
+            return
+
+        phases = ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in report["phases"].items()
+        )
+        files = report["files"]
+        requests = report["requests"]
+        self.line(f"<info>Pull stats</info>: {report['wall_time']:.2f}s wall time")
+        self.line(f"  phases: {phases or '-'}")
+        self.line(
+            f"  files: {files['fetched']} fetched, {files['skipped']} skipped, "
+            f"{files['cache_hits']} cache hits"
+        )
+        self.line(
+            f"  bytes: {report['bytes']['transferred']} transferred, "
+            f"{report['bytes']['written']} written"
+        )
+        if requests:
+            self.line(
+                f"  requests: {requests['api_calls']} API calls, "
+                f"{requests['not_modified']} not modified, {requests['retries']} retries"
+            )
+        if report["slowest_files"]:
+            self.line("  slowest files:")
+            for file in report["slowest_files"]:
+                self.line(
+                    f"    {file['seconds']:.3f}s  {file['path']} ({file['bytes']} bytes)"
+                )
+
+    def close_prompthubs(self, prompthubs: List[GitPromptHub]):
+        for prompthub in prompthubs:
+            if isinstance(prompthub, CloneGitPromptHub):
+                prompthub.close()
+
     def exec_prompt_hub(self, prompthub: AbstractPromptHub) -> List[Dict]:
         prompthub.pull_project()
 
         return prompthub.get_project_dependencies()
 
     def check_no_install_package(self, depend_list: List[Dict]) -> List[Dict]:
-        repo = PyPiRepository()
+        repo = PyPiRepository(transport=self.ssprompt.transport)
         no_install_depend_list = []
         for depend in depend_list:
             for package_name, version in depend.items():
@@ -144,7 +465,9 @@ Download these dependency packages locally through pip
         return no_install_depend_list
 
     def install_package(self, depend_list: List[Dict]):
-        repo = PyPiRepository()
+        repo = PyPiRepository(
+            transport=self.ssprompt.transport, http_cache=self.ssprompt.pypi_cache
+        )
         for depend in depend_list:
             for package_name, version in depend.items():
                 install_verison = repo.find_compatible_version(package_name, version)
@@ -4,7 +4,11 @@ from cleo.helpers import option
 
 from ssprompt.console.commands.command import Command
 from ssprompt.core.config import Config
-from ssprompt.core.prompthub import AbstractPromptHub, GitPromptHub
+from ssprompt.core.prompthub import (
+    AbstractPromptHub,
+    GitPromptHub,
+    LocalGitPromptHub,
+)
 
 
 class ShowCommand(Command):
@@ -34,10 +38,17 @@ class ShowCommand(Command):
         option(
             "platform",
             None,
-            "Choose Prompt Engineering Warehouse Platform. option: [github gitee]",
+            "Choose Prompt Engineering Warehouse Platform. option: [github gitee local]",
             flag=False,
             default="github",
         ),
+        option(
+            "mirror",
+            None,
+            "The path of the local Prompt Hub mirror, used with --platform local",
+            flag=False,
+        ),
+        option("no-cache", None, "Do not use the local HTTP cache", flag=True),
     ]
     help = """\
 The <c1> show </c1> command show the prompt engineering project meta infomation \
@@ -80,9 +91,27 @@ including remote or local.
         sub_pro = self.option("subproject")
         repo_type = self.option("platform")
 
-        gitprompthub = GitPromptHub(
-            repo_type, main_pro, sub_pro, self.ssprompt.github_access_key
-        )
+        gitprompthub: AbstractPromptHub
+        if repo_type == "local":
+            mirror = self.option("mirror") or self.ssprompt.local_mirror
+            if not mirror:
+                raise ValueError(
+                    "The local platform needs a Prompt Hub mirror. eg. --mirror /srv/PromptHub.git"
+                )
+            gitprompthub = LocalGitPromptHub(main_pro, sub_pro, Path(mirror))
+        else:
+            http_cache = None
+            if not self.option("no-cache"):
+                http_cache = self.ssprompt.http_cache
+
+            gitprompthub = GitPromptHub(
+                repo_type,
+                main_pro,
+                sub_pro,
+                self.ssprompt.github_access_key,
+                http_cache=http_cache,
+                transport=self.ssprompt.transport,
+            )
         config = self.exec_prompt_hub(gitprompthub)
 
         if not config:
@@ -0,0 +1,19 @@
+from ssprompt.core.cache.blob_cache import BlobCache, format_size, parse_size
+from ssprompt.core.cache.file_cache import (
+    FileCache,
+    evict_lru,
+    last_used,
+    parse_duration,
+)
+from ssprompt.core.cache.http_cache import HttpCache
+
+__all__ = [
+    "BlobCache",
+    "FileCache",
+    "HttpCache",
+    "evict_lru",
+    "format_size",
+    "last_used",
+    "parse_duration",
+    "parse_size",
+]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from ssprompt.core.cache.file_cache import FileCache
+from ssprompt.utils.githash import hash_file
+
+logger = logging.getLogger(__name__)
+
+"""
+    Blob缓存默认大小上限(bytes)
+"""
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(value: str | int) -> int:
+    """eg. 1024, 512K, 100M, 2G"""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+)\s*([KMGT]?)I?B?\s*", value.upper())
+    if not match:
+        raise ValueError(f"The size '{value}' is incorrect. eg. 500M")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2)]
+
+
+def format_size(size: int) -> str:
+    """eg. 512B, 1.5K, 100.0M"""
+    for unit in ["B", "K", "M", "G"]:
+        if size < 1024:
+            return f"{size}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+
+class BlobCache(FileCache):
+    """
+    User level content addressed cache of git blobs, keyed by blob SHA.
+    Entries are written atomically and their atime is bumped on every hit,
+    so eviction removes the least recently used blobs first.
+    """
+
+    def __init__(
+        self, path: Path, max_size: int = DEFAULT_MAX_SIZE, link: bool = False
+    ) -> None:
+        super().__init__(path)
+        self._max_size = max_size
+        self._link = link
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def get(self, sha: str) -> Path | None:
+        entry = self._entry(sha)
+        try:
+            self.touch(entry)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def contains(self, sha: str) -> bool:
+        """Whether the blob is cached, without counting as a use of it"""
+        return self._entry(sha).is_file()
+
+    def copy_to(self, sha: str, dest: str | Path) -> bool:
+        """
+        Restore the blob to dest. The entry is checked against its SHA first:
+        in the link mode it shares its content with the linked project files,
+        so editing one of them in place changes the entry too. A mismatching
+        entry is removed and the blob has to be downloaded again.
+        """
+        entry = self.get(sha)
+        if entry is None:
+            return False
+        try:
+            if hash_file(entry) != sha:
+                logger.warning(f"Blob {sha} in the cache was modified, remove it")
+                self.remove(str(entry))
+                return False
+            if self._link:
+                # dest 可能是已创建的临时文件, 先链接到旁边再改名覆盖
+                link_path = f"{dest}.link"
+                try:
+                    os.link(entry, link_path)
+                    os.replace(link_path, dest)
+                    return True
+                except OSError:
+                    # 跨文件系统等情况无法硬链接, 退回复制
+                    Path(link_path).unlink(missing_ok=True)
+            shutil.copyfile(entry, dest)
+        except FileNotFoundError:
+            # 其他进程刚好淘汰了该缓存
+            return False
+        logger.info(f"Blob {sha} restored from cache to {dest}")
+        return True
+
+    def put(self, sha: str, source: str | Path):
+        entry = self._entry(sha)
+        if entry.exists():
+            return
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry.parent, prefix=".", suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, entry)
+        except OSError as e:
+            logger.warning(f"Unable to cache blob {sha}: {e}")
+
+    def evict(self, max_size: int | None = None) -> int:
+        """Remove least recently used blobs until the cache fits max_size"""
+        return super().evict(self._max_size if max_size is None else max_size)
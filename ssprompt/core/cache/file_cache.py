@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+"""
+    写入中断后残留的临时文件, 超过该时间(s)后才会被清理
+"""
+STALE_TEMP_AGE = 3600
+
+_DURATION_UNITS = {"": 1, "S": 1, "M": 60, "H": 3600, "D": 86400, "W": 7 * 86400}
+
+
+def parse_duration(value: str | int) -> int:
+    """Seconds of a duration, eg. 3600, 90m, 12h, 7d, 2w"""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+)\s*([SMHDW]?)\s*", value.upper())
+    if not match:
+        raise ValueError(f"The duration '{value}' is incorrect. eg. 7d")
+    return int(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+def last_used(stat: os.stat_result) -> float:
+    """When a cache entry was last written or read"""
+    return max(stat.st_atime, stat.st_mtime)
+
+
+class FileCache:
+    """
+    Directory of cache entries stored as <key[:2]>/<key>, one file each.
+    Entries are written to a hidden temporary file and renamed into place, and
+    their atime is bumped on every hit. The mtime is kept: a hard linked entry
+    shares it with the linked project file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _entry(self, key: str) -> Path:
+        return self._path.joinpath(key[:2], key)
+
+    def touch(self, path: str | Path):
+        """Record a hit of the entry, for the LRU eviction"""
+        stat = os.stat(path)
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+
+    def entries(self) -> List[Tuple[str, os.stat_result]]:
+        return self._scan()[0]
+
+    def _scan(
+        self,
+    ) -> Tuple[List[Tuple[str, os.stat_result]], List[Tuple[str, os.stat_result]]]:
+        """The entries and the temporary files of the cache, in one directory walk"""
+        entries: List[Tuple[str, os.stat_result]] = []
+        temps: List[Tuple[str, os.stat_result]] = []
+        if not self._path.is_dir():
+            return entries, temps
+        for sub_dir in os.scandir(self._path):
+            if not sub_dir.is_dir():
+                continue
+            for entry in os.scandir(sub_dir.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                # 写入中的临时文件以 "." 开头
+                (temps if entry.name.startswith(".") else entries).append(
+                    (entry.path, stat)
+                )
+        return entries, temps
+
+    def size(self) -> int:
+        return sum(stat.st_size for _, stat in self.entries())
+
+    def remove(self, path: str, stat: os.stat_result | None = None) -> bool:
+        """
+        Remove an entry. When stat is given and the entry was accessed since,
+        it is kept: another process is using it. Readers that already opened
+        the entry keep reading the unlinked file.
+        """
+        try:
+            if stat is not None and last_used(os.stat(path)) != last_used(stat):
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            # Windows 下其他进程打开的文件无法删除
+            logger.debug(f"Unable to remove cache entry {path}: {e}")
+            return False
+        return True
+
+    def evict(self, max_size: int) -> int:
+        """Remove least recently used entries until the cache fits max_size"""
+        removed, _ = evict_lru([self], max_size=max_size)
+        if removed:
+            logger.info(f"Evicted {removed} entries from {self._path}")
+        return removed
+
+    def clear(self) -> Tuple[int, int]:
+        """Remove every entry, returning the number of entries and bytes removed"""
+        removed = freed = 0
+        for path, stat in self.entries():
+            if self.remove(path):
+                removed += 1
+                freed += stat.st_size
+        self.remove_stale_temp(0)
+        return removed, freed
+
+    def remove_stale_temp(
+        self,
+        age: float = STALE_TEMP_AGE,
+        temps: List[Tuple[str, os.stat_result]] | None = None,
+    ):
+        """
+        Remove the temporary files left by writers interrupted age seconds ago,
+        among temps when the caller has already scanned the cache.
+        """
+        deadline = time.time() - age
+        for path, stat in self._scan()[1] if temps is None else temps:
+            if stat.st_mtime <= deadline:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+
+
+def evict_lru(
+    caches: Iterable[FileCache],
+    max_size: int | None = None,
+    older_than: float | None = None,
+) -> Tuple[int, int]:
+    """
+    Remove the least recently used entries across the caches: every entry not
+    accessed for older_than seconds, then the oldest ones until the caches fit
+    max_size bytes together. Returns the number of entries and bytes removed.
+    """
+    # 每个缓存只遍历一次目录, 同时得到条目和残留的临时文件
+    scans = [(cache, cache._scan()) for cache in caches]
+    entries = [
+        (cache, path, stat) for cache, (items, _) in scans for path, stat in items
+    ]
+    total = sum(stat.st_size for _, _, stat in entries)
+    deadline = time.time() - older_than if older_than is not None else None
+
+    removed = freed = 0
+    for cache, path, stat in sorted(entries, key=lambda entry: last_used(entry[2])):
+        expired = deadline is not None and last_used(stat) < deadline
+        if not expired and (max_size is None or total <= max_size):
+            break
+        # 扫描之后被访问过的条目正在使用, 跳过
+        if cache.remove(path, stat):
+            removed += 1
+            freed += stat.st_size
+            total -= stat.st_size
+    for cache, (_, temps) in scans:
+        cache.remove_stale_temp(temps=temps)
+    return removed, freed
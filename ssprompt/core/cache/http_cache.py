@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from ssprompt.core.cache.file_cache import FileCache
+
+logger = logging.getLogger(__name__)
+
+"""
+    缓存响应时保留的响应头
+"""
+KEPT_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+
+class HttpCache(FileCache):
+    """
+    On-disk cache of HTTP GET responses carrying an ETag or Last-Modified
+    validator. Cached entries are revalidated with a conditional request and
+    a 304 answer is served from disk.
+
+    Each entry is a single file: one JSON header line followed by the body.
+    """
+
+    def _response_entry(self, url: str, headers: Mapping[str, str] | None) -> Path:
+        accept = (headers or {}).get("Accept", "")
+        return self._entry(sha256(f"{url}\n{accept}".encode()).hexdigest())
+
+    @staticmethod
+    def url_of(entry: str | Path) -> str:
+        """The URL of a cached response, read from its header line"""
+        try:
+            with open(entry, "rb") as file:
+                return json.loads(file.readline()).get("url", "")
+        except (OSError, ValueError):
+            return ""
+
+    def contains(self, url: str, headers: Mapping[str, str] | None = None) -> bool:
+        """Whether a response of url is cached, without counting as a use of it"""
+        return self._response_entry(url, headers).is_file()
+
+    def urls(self, prefix: str = "") -> List[str]:
+        """The URLs of the cached responses starting with prefix"""
+        urls = []
+        for entry, _ in self.entries():
+            url = self.url_of(entry)
+            if url.startswith(prefix):
+                urls.append(url)
+        return urls
+
+    def load(
+        self, url: str, headers: Mapping[str, str] | None = None
+    ) -> Dict[str, Any] | None:
+        entry = self._response_entry(url, headers)
+        try:
+            with open(entry, "rb") as file:
+                meta = json.loads(file.readline())
+                meta["body"] = file.read()
+        except (OSError, ValueError):
+            return None
+        # 记录最近访问时间, 用于按 LRU 淘汰
+        try:
+            self.touch(entry)
+        except OSError:
+            pass
+        return meta
+
+    def conditional_headers(self, cached: Mapping[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if etag := cached["headers"].get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := cached["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def store(
+        self,
+        url: str,
+        headers: Mapping[str, str] | None,
+        response: requests.Response,
+    ):
+        if response.status_code != 200:
+            return
+        if "ETag" not in response.headers and "Last-Modified" not in response.headers:
+            return
+
+        entry = self._response_entry(url, headers)
+        meta = {
+            "url": url,
+            "encoding": response.encoding,
+            "headers": {
+                name: response.headers[name]
+                for name in KEPT_HEADERS
+                if name in response.headers
+            },
+        }
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry.parent, prefix=".", suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(json.dumps(meta).encode() + b"\n")
+                file.write(response.content)
+            os.replace(tmp_path, entry)
+        except OSError as e:
+            logger.warning(f"Unable to cache response of {url}: {e}")
+
+    def fetch(
+        self,
+        send: Callable[..., requests.Response],
+        url: str,
+        headers: Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        """GET url through send(url, headers=...), revalidating the cached copy"""
+        cached = self.load(url, headers)
+        request_headers = dict(headers or {})
+        if cached:
+            request_headers.update(self.conditional_headers(cached))
+
+        response = send(url, headers=request_headers)
+        if response.status_code == 304 and cached:
+            logger.debug(f"{url} not modified, use the cached response")
+            return self.to_response(cached)
+        self.store(url, headers, response)
+        return response
+
+    @staticmethod
+    def to_response(cached: Mapping[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = cached["url"]
+        response.headers = CaseInsensitiveDict(cached["headers"])
+        response.encoding = cached["encoding"]
+        response._content = cached["body"]
+        return response
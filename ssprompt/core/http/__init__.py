@@ -0,0 +1,4 @@
+from ssprompt.core.http.scheduler import RequestScheduler
+from ssprompt.core.http.transport import Transport, get_transport
+
+__all__ = ["RequestScheduler", "Transport", "get_transport"]
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict
+
+import requests
+
+if TYPE_CHECKING:
+    from ssprompt.core.http.transport import Transport
+
+logger = logging.getLogger(__name__)
+
+"""
+    指数退避的最大等待时间(s)
+"""
+MAX_BACKOFF = 60
+
+"""
+    触发主限流时最多等待配额重置的时间(s), 超过则直接返回失败
+"""
+MAX_RESET_WAIT = 60
+
+"""
+    每个并发请求至少保留的剩余配额, 配额不足时降低并发
+"""
+BUDGET_PER_SLOT = 10
+
+
+class RequestScheduler:
+    """
+    Runs every hub request, tracking GitHub's X-RateLimit-Remaining/Reset headers.
+
+    Concurrency shrinks as the remaining budget runs low. When the budget is
+    exhausted, requests wait for the reset. Secondary rate limits (403/429,
+    usually with Retry-After) and server errors are retried with jittered
+    exponential backoff. Request counters are kept for reporting.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_retries: int = 3,
+        retry_delay: int = 200,
+    ) -> None:
+        self._max_concurrency = max_concurrency
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay / 1000
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._limit = max_concurrency
+        self._remaining: int | None = None
+        self._reset: float | None = None
+
+        self._requests = 0
+        self._api_calls = 0
+        self._not_modified = 0
+        self._retries = 0
+        self._rate_limited = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "requests": self._requests,
+                "api_calls": self._api_calls,
+                "not_modified": self._not_modified,
+                "retries": self._retries,
+                "rate_limited": self._rate_limited,
+                "rate_limit_remaining": self._remaining,
+                "rate_limit_reset": self._reset,
+            }
+
+    def request(
+        self, transport: Transport, method: str, url: str, **kwargs: Any
+    ) -> requests.Response:
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                response = transport.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self._max_retries:
+                    raise
+                delay = self._backoff(attempt, self._retry_delay)
+                logger.warning(f"Request {url} failed: {e}, retrying in {delay:.2f}s")
+                self._count_retry()
+                attempt += 1
+                time.sleep(delay)
+                continue
+            finally:
+                self._release()
+
+            self._update(response)
+            delay = self._retry_after(response, attempt)
+            if delay is None or attempt >= self._max_retries:
+                if delay is not None:
+                    logger.error(
+                        "Max retry attempts reached.\n Please check and try again"
+                    )
+                return response
+
+            logger.warning(
+                f"Request {url} got status code {response.status_code}, retrying in {delay:.2f}s"
+            )
+            response.close()
+            self._count_retry()
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, transport: Transport, url: str, **kwargs: Any) -> requests.Response:
+        return self.request(transport, "GET", url, **kwargs)
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                wait = self._reset_wait()
+                if wait <= 0 and self._active < self._limit:
+                    self._active += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _reset_wait(self) -> float:
+        """Seconds until the exhausted budget resets, 0 if requests may go on"""
+        if self._remaining != 0 or self._reset is None:
+            return 0
+        wait = self._reset - time.time()
+        if wait <= 0 or wait > MAX_RESET_WAIT:
+            # 配额已重置, 或等待过久时放行请求, 由调用方处理失败
+            return 0
+        return wait
+
+    def _update(self, response: requests.Response):
+        headers = response.headers
+        with self._cond:
+            self._requests += 1
+            if response.status_code == 304:
+                self._not_modified += 1
+            elif "X-RateLimit-Remaining" in headers:
+                self._api_calls += 1
+
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+            if remaining is None or not remaining.isdigit():
+                return
+            self._remaining = int(remaining)
+            if reset and reset.isdigit():
+                self._reset = float(reset)
+
+            # 剩余配额不足时降低并发, 配额重置后恢复
+            self._limit = max(
+                1,
+                min(self._max_concurrency, self._remaining // BUDGET_PER_SLOT),
+            )
+            self._cond.notify_all()
+
+    def _retry_after(self, response: requests.Response, attempt: int) -> float | None:
+        """The delay before retrying the response, None if it must not be retried"""
+        status = response.status_code
+        headers = response.headers
+        if status in (403, 429):
+            retry_after = headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            elif headers.get("X-RateLimit-Remaining") == "0":
+                reset = headers.get("X-RateLimit-Reset", "")
+                delay = float(reset) - time.time() if reset.isdigit() else -1
+                if delay > MAX_RESET_WAIT:
+                    logger.error(
+                        "GitHub API rate limit exceeded, please set GITHUB_ACCESS_KEY or try again later"
+                    )
+                    return None
+                delay = max(delay, 0) + random.uniform(0, 1)
+            elif status == 429 or "rate limit" in response.text.lower():
+                # 次级限流没有给出等待时间, 至少等待1秒并指数退避
+                delay = self._backoff(attempt, 1)
+            else:
+                return None
+            with self._cond:
+                self._rate_limited += 1
+            return delay
+        if status >= 500:
+            return self._backoff(attempt, self._retry_delay)
+        return None
+
+    @staticmethod
+    def _backoff(attempt: int, base: float) -> float:
+        delay = min(MAX_BACKOFF, base * 2**attempt)
+        return random.uniform(delay / 2, delay)
+
+    def _count_retry(self):
+        with self._cond:
+            self._retries += 1
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+"""
+    每个主机保持的 keep-alive 连接数
+"""
+DEFAULT_POOL_SIZE = 10
+
+"""
+    连接超时与读取超时(s)
+"""
+DEFAULT_TIMEOUT = (10.0, 60.0)
+
+Timeout = Tuple[float, float]
+
+
+class Transport:
+    """
+    HTTP transport shared by the Prompt Hub and package repository clients.
+
+    One requests session with keep-alive connection pools per host, so every
+    command reuses its TLS connections. Default timeouts are applied to each
+    request and gzip is negotiated. Credentials are never stored on the
+    session, callers pass them per request.
+    """
+
+    def __init__(
+        self, pool_size: int = DEFAULT_POOL_SIZE, timeout: Timeout = DEFAULT_TIMEOUT
+    ) -> None:
+        self._lock = threading.Lock()
+        self._pool_size = 0
+        self._timeout = timeout
+        self._session = requests.Session()
+        self._session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        self.ensure_pool_size(pool_size)
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    @property
+    def timeout(self) -> Timeout:
+        return self._timeout
+
+    def configure(self, pool_size: int | None = None, timeout: Timeout | None = None):
+        if timeout is not None:
+            self._timeout = timeout
+        if pool_size is not None:
+            self.ensure_pool_size(pool_size)
+
+    def ensure_pool_size(self, pool_size: int):
+        """Grow the per host pools so pool_size threads can hold a connection each"""
+        with self._lock:
+            if pool_size <= self._pool_size:
+                return
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._pool_size = pool_size
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        return self._session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        self._session.close()
+
+
+_transport: Transport | None = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """The process wide transport"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
@@ -1,4 +1,13 @@
 from ssprompt.core.prompthub.git_prompthub import GitPromptHub
 from ssprompt.core.prompthub.abstract_prompthub import AbstractPromptHub
+from ssprompt.core.prompthub.async_prompthub import AsyncGitPromptHub
+from ssprompt.core.prompthub.local_prompthub import LocalGitPromptHub
+from ssprompt.core.prompthub.clone_prompthub import CloneGitPromptHub
 
-__all__ = ["GitPromptHub", "AbstractPromptHub"]
+__all__ = [
+    "GitPromptHub",
+    "AsyncGitPromptHub",
+    "LocalGitPromptHub",
+    "CloneGitPromptHub",
+    "AbstractPromptHub",
+]
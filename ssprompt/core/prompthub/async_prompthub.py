@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Callable, ClassVar, Dict, List
+
+from pydantic import PrivateAttr
+
+from ssprompt.core.config import Config
+from ssprompt.core.prompthub.abstract_prompthub import AbstractPromptHub
+from ssprompt.core.prompthub.git_prompthub import DEFAULT_JOBS, GitPromptHub
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGitPromptHub(AbstractPromptHub):
+    """
+    Awaitable PromptHub client for applications running an asyncio event loop.
+
+    Blocking HTTP and file I/O of the wrapped GitPromptHub is moved onto worker
+    threads, so the event loop keeps serving while a project is pulled. The
+    pull runs the step API of the hub, its download tasks concurrently,
+    bounded by a semaphore of `jobs` slots.
+    """
+
+    # 被包装的同步实现, 子类可替换, 例如指向测试服务器的 GitPromptHub
+    hub_class: ClassVar[type[GitPromptHub]] = GitPromptHub
+
+    _hub: GitPromptHub = PrivateAttr()
+    _jobs: int = PrivateAttr()
+
+    def __init__(
+        self,
+        git_type: str,
+        main_project: str,
+        sub_project: str,
+        access_key: str,
+        types: str = "",
+        typedir: str = "",
+        path: Path = Path("."),
+        dir_flag: bool = True,
+        jobs: int = DEFAULT_JOBS,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            main_project=main_project,
+            sub_project=sub_project,
+            path=path,
+            types=types,
+            typedir=typedir,
+        )
+        self._hub = self.hub_class(
+            git_type,
+            main_project,
+            sub_project,
+            access_key,
+            types,
+            typedir,
+            path,
+            dir_flag,
+            jobs,
+            **kwargs,
+        )
+        self._jobs = jobs
+
+    @property
+    def hub(self) -> GitPromptHub:
+        return self._hub
+
+    async def check_project_exists(self) -> bool:
+        return await asyncio.to_thread(self._hub.check_project_exists)
+
+    async def get_project_meta(self) -> Config:
+        return await asyncio.to_thread(self._hub.get_project_meta)
+
+    async def get_remote_project_meta(self) -> Config | Any:
+        return await asyncio.to_thread(self._hub.get_remote_project_meta)
+
+    async def pull_project(self):
+        hub = self._hub
+        plan = await self._to_thread(hub.begin_pull)
+        succeeded = False
+        try:
+            tasks = await self._to_thread(hub.prepare_pull, plan)
+            with hub.pull_stats.phase("download"):
+                await self._run_tasks(tasks)
+            succeeded = True
+        finally:
+            await self._to_thread(hub.finish_pull, succeeded)
+
+    async def _run_tasks(self, tasks: List[Callable[[], None]]):
+        semaphore = asyncio.Semaphore(self._jobs)
+
+        async def run(task: Callable[[], None]):
+            async with semaphore:
+                await self._to_thread(task)
+
+        futures = [asyncio.ensure_future(run(task)) for task in tasks]
+        try:
+            await asyncio.gather(*futures)
+        except BaseException:
+            # 取消尚未开始的任务, 并等待已在线程中运行的任务结束后再收尾
+            for future in futures:
+                future.cancel()
+            await asyncio.gather(*futures, return_exceptions=True)
+            raise
+
+    @staticmethod
+    async def _to_thread(func: Callable[..., Any], *args: Any) -> Any:
+        """
+        asyncio.to_thread, except that a cancelled call still waits for the
+        thread to return, as the thread itself can't be interrupted.
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            while not future.done():
+                try:
+                    await asyncio.wait([future])
+                except asyncio.CancelledError:
+                    pass
+            raise
+
+    async def get_project_dependencies(self) -> List[Dict]:
+        return await asyncio.to_thread(self._hub.get_project_dependencies)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+from pydantic import BaseModel, ValidationError
+from tqdm import tqdm
+
+from ssprompt.core.http import RequestScheduler
+from ssprompt.core.prompthub.git_prompthub import (
+    DEFAULT_JOBS,
+    MAX_RETRIES,
+    RETRY_DELAY,
+    GitPromptHub,
+)
+from ssprompt.core.prompthub.stats import PullStats
+
+logger = logging.getLogger(__name__)
+
+
+class PullEntry(BaseModel):
+    """One project of a pull list, eg. {subproject: example, types: json}"""
+
+    project: str = ""
+    subproject: str = ""
+    types: str = ""
+    typedir: str = ""
+    path: Path = Path(".")
+    dirflag: bool = True
+
+
+class PullList(BaseModel):
+    """
+    A prompts.yaml pull list. The top level project is the default main project
+    of the entries, relative paths are resolved against the list's directory.
+    """
+
+    project: str = ""
+    prompts: List[PullEntry] = []
+
+    @classmethod
+    def load(cls, file_path: Path, default_project: str = "") -> PullList:
+        try:
+            with open(file_path, "r") as file:
+                data = yaml.safe_load(file) or {}
+        except (OSError, yaml.YAMLError) as e:
+            raise ValueError(f"Failed to read the pull list '{file_path}', {e}")
+        if isinstance(data, list):
+            data = {"prompts": data}
+        try:
+            pull_list = cls.parse_obj(data)
+        except ValidationError as e:
+            raise ValueError(f"The pull list '{file_path}' is incorrect, {e}")
+
+        base_path = file_path.parent
+        for entry in pull_list.prompts:
+            entry.project = entry.project or pull_list.project or default_project
+            if not entry.path.is_absolute():
+                entry.path = base_path.joinpath(entry.path)
+        return pull_list
+
+
+class BatchPull:
+    """
+    Pull many Prompt Hub projects in one run. All hubs share one download worker
+    pool, one request scheduler (and so one rate limit budget) and one progress
+    bar, while the projects themselves are listed concurrently.
+    """
+
+    def __init__(self, jobs: int = DEFAULT_JOBS) -> None:
+        self.jobs = jobs
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        self.scheduler = RequestScheduler(jobs, MAX_RETRIES, RETRY_DELAY)
+        self.progress = tqdm(desc="Pulling", unit="file", total=0)
+        self.stats = PullStats()
+
+    @property
+    def shared(self) -> Dict[str, Any]:
+        """Keyword arguments sharing the batch resources with a GitPromptHub"""
+        return {
+            "executor": self.executor,
+            "progress": self.progress,
+            "scheduler": self.scheduler,
+            "stats": self.stats,
+        }
+
+    def run(
+        self, hubs: List[GitPromptHub]
+    ) -> Tuple[List[Dict], Dict[str, Exception]]:
+        """
+        Pull every hub, returns the combined dependencies of the pulled projects
+        and the errors of the failed ones, keyed by their label().
+        """
+        self.progress.set_description(f"Pulling {len(hubs)} projects")
+        # 同一保存目录共用清单和 partial 目录, 其下的工程依次拉取
+        groups: Dict[Path, List[GitPromptHub]] = {}
+        for hub in hubs:
+            groups.setdefault(hub.save_path, []).append(hub)
+
+        depend_list: List[Dict] = []
+        failures: Dict[str, Exception] = {}
+        # 工程的拉取流程在独立线程中进行, 文件下载提交到共享线程池
+        with ThreadPoolExecutor(max_workers=min(len(groups), self.jobs) or 1) as drivers:
+            futures = [drivers.submit(self._pull_group, group) for group in groups.values()]
+            for future in futures:
+                dependencies, errors = future.result()
+                depend_list.extend(dependencies)
+                failures.update(errors)
+        return self._unique(depend_list), failures
+
+    @staticmethod
+    def label(hub: GitPromptHub) -> str:
+        """
+        eg. "ptonlix/PromptHub example [json] /path/example". A sub project can be
+        pulled several times with other types or paths, so they are part of it.
+        """
+        project = f"{hub.main_project} {hub.sub_project}".strip()
+        if hub.types:
+            project += f" [{hub.types}]"
+        return f"{project} {hub.save_path}"
+
+    def _pull_group(
+        self, hubs: List[GitPromptHub]
+    ) -> Tuple[List[Dict], Dict[str, Exception]]:
+        depend_list: List[Dict] = []
+        failures: Dict[str, Exception] = {}
+        for hub in hubs:
+            try:
+                depend_list.extend(self._pull(hub))
+            except Exception as e:
+                logger.error(f"Failed to pull {self.label(hub)}, {e}")
+                failures[self.label(hub)] = e
+        return depend_list, failures
+
+    @staticmethod
+    def _unique(depend_list: List[Dict]) -> List[Dict]:
+        # 多个工程可能声明相同的依赖
+        unique_data = []
+        seen_values = set()
+        for item in depend_list:
+            item_str = json.dumps(item, sort_keys=True)
+            if item_str not in seen_values:
+                unique_data.append(item)
+                seen_values.add(item_str)
+        return unique_data
+
+    @staticmethod
+    def _pull(hub: GitPromptHub) -> List[Dict]:
+        hub.pull_project()
+        return hub.get_project_dependencies()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+        self.progress.close()
+
+    def __enter__(self) -> BatchPull:
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import base64
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+from pydantic import PrivateAttr
+
+from ssprompt.core.cache import BlobCache
+from ssprompt.core.config import Config
+from ssprompt.core.prompthub.git_prompthub import DEFAULT_JOBS
+from ssprompt.core.prompthub.local_prompthub import LocalGitPromptHub, _CatFileBatch
+from ssprompt.core.vcs.git import GitConfig
+
+logger = logging.getLogger(__name__)
+
+"""
+    浅克隆的深度, 只需要远端分支的最新提交
+"""
+CLONE_DEPTH = 1
+
+
+class CloneGitPromptHub(LocalGitPromptHub):
+    """
+    Prompt Hub pulled with the system git: a partial (blob:none), shallow and
+    sparse clone limited to the pulled directory and the metafile. Git sends
+    the needed objects as one compressed pack, instead of a request per file.
+    The clone is made on first use in a temporary directory, call close() to
+    remove it. Listing only needs the trees; the blobs are checked out when
+    the first file is read, so a dry run transfers no blob.
+    """
+
+    _clone_url: str = PrivateAttr()
+    _cloned: bool = PrivateAttr(default=False)
+    _checked_out: bool = PrivateAttr(default=False)
+    _clone_lock: Any = PrivateAttr()
+
+    platform: Dict[str, Dict[Any, Any]] = {
+        "local": {},
+        "github": {"clone": "https://github.com/{repo_url}.git"},
+    }
+
+    def __init__(
+        self,
+        git_type: str,
+        main_project: str,
+        sub_project: str,
+        access_key: str,
+        types: str = "",
+        typedir: str = "",
+        path: Path = Path("."),
+        dir_flag: bool = True,
+        jobs: int = DEFAULT_JOBS,
+        blob_cache: BlobCache | None = None,
+        clone_url: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if git_type not in self.__fields__["platform"].default or git_type == "local":
+            raise ValueError("The Git Type is incorrect, the clone mode supports [github]")
+        if not GitConfig().installed:
+            raise ValueError("Git not installed, the clone mode needs git")
+        super().__init__(
+            main_project,
+            sub_project,
+            Path(tempfile.mkdtemp(prefix="ssprompt-clone-")),
+            types,
+            typedir,
+            path,
+            dir_flag,
+            jobs,
+            blob_cache=blob_cache,
+            **kwargs,
+        )
+        self._clone_url = clone_url or self.platform[git_type]["clone"].format(
+            repo_url=main_project
+        )
+        self._access_key = access_key
+        self._clone_lock = threading.Lock()
+
+    def _remote_git(self, *args: str) -> bytes:
+        """Run a git command talking to the remote, authenticated by the access key"""
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        if self._access_key and self._clone_url.startswith("https://"):
+            # 通过环境变量传入认证头, 避免令牌出现在进程参数中
+            token = base64.b64encode(f"x-access-token:{self._access_key}".encode())
+            env.update(
+                GIT_CONFIG_COUNT="1",
+                GIT_CONFIG_KEY_0="http.extraHeader",
+                GIT_CONFIG_VALUE_0=f"Authorization: Basic {token.decode()}",
+            )
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, check=True, env=env
+            ).stdout
+        except subprocess.CalledProcessError as e:
+            logger.debug(e.stderr)
+            raise ValueError(
+                f"Failed to clone {self.main_project}, {str(e.stderr, 'utf-8').strip()}"
+            )
+
+    def _sparse_patterns(self) -> List[str]:
+        prefix = self._path_prefix(self._directory_path)
+        meta_file = (
+            self.sub_project + "/" + self.metafile_name
+            if self.sub_project
+            else self.metafile_name
+        )
+        return [f"/{prefix}", f"/{meta_file}"]
+
+    def _ensure_clone(self):
+        with self._clone_lock:
+            if self._cloned:
+                return
+            self._remote_git(
+                "clone",
+                "--quiet",
+                "--no-checkout",
+                "--depth",
+                str(CLONE_DEPTH),
+                "--filter=blob:none",
+                self._clone_url,
+                str(self._mirror),
+            )
+            if self._directory_path:
+                super()._git("sparse-checkout", "set", "--no-cone", *self._sparse_patterns())
+
+            head_sha = super()._git("rev-parse", "HEAD").decode().strip()
+            if self._commit_sha and self._commit_sha != head_sha:
+                logger.warning(
+                    f"The remote branch moved to {head_sha[:7]} while cloning"
+                )
+            self._commit_sha = head_sha
+            self._cloned = True
+            logger.info(f"Cloned {self.main_project} at {head_sha[:7]}")
+
+    def _ensure_checkout(self):
+        self._ensure_clone()
+        with self._clone_lock:
+            if self._checked_out:
+                return
+            # 检出时按稀疏规则一次性拉取所需的文件对象
+            self._remote_git("-C", str(self._mirror), "checkout", "--quiet")
+            self._checked_out = True
+
+    def _git(self, *args: str) -> bytes:
+        self._ensure_clone()
+        return super()._git(*args)
+
+    def _batch(self) -> _CatFileBatch:
+        self._ensure_checkout()
+        return super()._batch()
+
+    def _fetch_remote_project_meta(self) -> Config | Any:
+        self._ensure_checkout()
+        return super()._fetch_remote_project_meta()
+
+    def _resolve_ref(self, ref: str | None = None) -> str | None:
+        if self._commit_sha or self._cloned:
+            return super()._resolve_ref(ref)
+        # 尚未克隆时通过 ls-remote 获取提交, 远端无变化则无需克隆
+        try:
+            output = self._remote_git("ls-remote", self._clone_url, self._ref)
+        except ValueError as e:
+            logger.error(e)
+            return None
+        if not output:
+            logger.error(f"Failed to resolve {self._ref} of {self.main_project}")
+            return None
+        self._commit_sha = output.decode().split()[0]
+        return self._commit_sha
+
+    def _list_github_tree(self, directory_path: str) -> List[Dict] | None:
+        # 先克隆, 使列出的目录树与克隆的提交一致
+        self._ensure_clone()
+        # 检出前不读取文件大小, ls-tree -l 会逐个下载缺失的 Blob
+        return self._ls_tree(directory_path, sizes=self._checked_out)
+
+    def close(self):
+        """Remove the temporary clone"""
+        with self._clone_lock:
+            shutil.rmtree(self._mirror, ignore_errors=True)
+            self._cloned = False
+            self._checked_out = False
@@ -1,17 +1,37 @@
-from typing import Any, List, Dict
+from __future__ import annotations
+
+from typing import IO, Any, Callable, ContextManager, Iterator, List, Dict, Tuple
 from pathlib import Path
 
 from ssprompt.core.prompthub.abstract_prompthub import AbstractPromptHub
 from ssprompt.core.config import PyYaml, Config
+from ssprompt.core.cache import BlobCache, HttpCache
+from ssprompt.core.http import RequestScheduler, Transport, get_transport
+from ssprompt.core.prompthub.manifest import MANIFEST_DIR, Manifest
+from ssprompt.core.prompthub.plan import PullPlan
+from ssprompt.core.prompthub.stats import PullStats
+from ssprompt.utils.githash import BlobHasher, blob_sha, hash_file, hash_tree
 import requests
 from pydantic import BaseModel, validator, PrivateAttr
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from urllib.parse import quote
 import os
+import shutil
 import logging
+import tempfile
+import threading
 import time
 from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
+"""
+    以 raw 媒体类型请求 contents 接口, 直接返回文件内容
+"""
+RAW_HEADERS = {"Accept": "application/vnd.github.raw"}
+
 """
     访问github等失败尝试次数
 """
@@ -22,6 +42,50 @@ MAX_RETRIES = 3
 """
 RETRY_DELAY = 200
 
+"""
+    并发下载Prompt文件的默认线程数
+"""
+DEFAULT_JOBS = 8
+
+"""
+    拉取模式: tree 通过 Git Trees API 一次获取整个目录树, contents 逐级遍历目录,
+    archive 下载仓库压缩包流式解压, auto 根据文件数量在 tree 和 archive 之间选择
+"""
+PULL_MODES = ["auto", "tree", "contents", "archive"]
+
+"""
+    auto 模式下完整拉取工程时, 文件数超过该值则改用压缩包下载
+"""
+ARCHIVE_THRESHOLD = 100
+
+"""
+    GitHub compare 接口最多返回的文件数, 达到该值时退回完整拉取
+"""
+COMPARE_FILES_LIMIT = 300
+
+"""
+    流式读写文件的块大小(bytes)
+"""
+CHUNK_SIZE = 64 * 1024
+
+"""
+    下载中的文件所在目录, 相对于拉取清单目录, 文件改名后才出现在工程中
+"""
+PARTIAL_DIR = "partial"
+
+
+class _CountingReader:
+    """Read-only file object counting the bytes read from the wrapped one"""
+
+    def __init__(self, file: IO[bytes]) -> None:
+        self._file = file
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        self.count += len(chunk)
+        return chunk
+
 
 class GitModel(BaseModel):
     # git_type: str
@@ -54,19 +118,48 @@ class GitModel(BaseModel):
 
 class GitPromptHub(AbstractPromptHub):
     _platfrom: Dict = PrivateAttr()
-    _session: Any = PrivateAttr()
+    _transport: Transport = PrivateAttr()
+    _scheduler: RequestScheduler = PrivateAttr()
     _dir_flag: bool = PrivateAttr()
     _access_key: str = PrivateAttr()
     _types_flag: bool = PrivateAttr()
+    _jobs: int = PrivateAttr()
+    _mode: str = PrivateAttr()
+    _archive_threshold: int = PrivateAttr()
+    _blob_cache: BlobCache | None = PrivateAttr()
+    _http_cache: HttpCache | None = PrivateAttr()
+    _manifest: Manifest | None = PrivateAttr(default=None)
+    _commit_sha: str | None = PrivateAttr(default=None)
+    _executor: Executor | None = PrivateAttr()
+    _progress: tqdm | None = PrivateAttr()
+    _meta_cache: Dict[str, Tuple[Any, Config]] = PrivateAttr(default_factory=dict)
+    _stats: PullStats = PrivateAttr()
+    _offline: bool = PrivateAttr()
+    _blob_locks: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _blob_locks_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _landed: Dict[str, str] = PrivateAttr(default_factory=dict)
+    _failed: List[str] = PrivateAttr(default_factory=list)
 
     platform: Dict[str, Dict[Any, Any]] = {
         "github": {
             "repos": "https://api.github.com/repos/{repo_url}",
             "content": "https://api.github.com/repos/{repo_url}/contents/{file_path}",
+            "commit": "https://api.github.com/repos/{repo_url}/commits/{ref}",
+            "tree": "https://api.github.com/repos/{repo_url}/git/trees/{sha}?recursive=1",
+            "raw": "https://raw.githubusercontent.com/{repo_url}/{ref}/{file_path}",
+            "tarball": "https://api.github.com/repos/{repo_url}/tarball/{ref}",
+            "compare": "https://api.github.com/repos/{repo_url}/compare/{base}...{head}",
         },
         "gitee": {},
     }
 
+    @validator("path")
+    def valid_path(cls, value: Path) -> Path:
+        # 不存在的目录在拉取开始时创建, 预演拉取时不创建
+        if value.exists() and not value.is_dir():
+            raise ValueError("The Path isn't directory")
+        return value
+
     def __init__(
         self,
         git_type: str,
@@ -77,6 +170,17 @@ class GitPromptHub(AbstractPromptHub):
         typedir: str = "",
         path: Path = Path("."),
         dir_flag: bool = True,
+        jobs: int = DEFAULT_JOBS,
+        mode: str = "auto",
+        archive_threshold: int = ARCHIVE_THRESHOLD,
+        blob_cache: BlobCache | None = None,
+        http_cache: HttpCache | None = None,
+        transport: Transport | None = None,
+        executor: Executor | None = None,
+        progress: tqdm | None = None,
+        scheduler: RequestScheduler | None = None,
+        stats: PullStats | None = None,
+        offline: bool = False,
     ) -> None:
         super().__init__(
             main_project=main_project,
@@ -87,16 +191,93 @@ class GitPromptHub(AbstractPromptHub):
         )
         if git_type not in self.platform.keys():
             raise ValueError("The Git Type is incorrect, [github or gitee]")
+        if jobs < 1:
+            raise ValueError("The number of jobs must be at least 1")
+        if mode not in PULL_MODES:
+            raise ValueError(f"The pull mode is incorrect, {PULL_MODES}")
+        if offline and not (blob_cache and http_cache):
+            raise ValueError("The offline mode needs the blob cache and the HTTP cache")
         self._platfrom = self.platform.get(git_type, {})
-        self._session = requests.Session()
-        if access_key:
-            self._session.headers.update({"Authorization": f"token {access_key}"})
+        self._jobs = jobs
+        self._mode = mode
+        self._archive_threshold = archive_threshold
+        self._blob_cache = blob_cache
+        self._http_cache = http_cache
+        # 所有下载线程共享进程级连接池, 复用 keep-alive 连接
+        self._transport = transport or get_transport()
+        self._transport.ensure_pool_size(jobs)
+        self._scheduler = scheduler or RequestScheduler(jobs, MAX_RETRIES, RETRY_DELAY)
+        # 批量拉取时多个工程共享线程池和进度条
+        self._executor = executor
+        self._progress = progress
+        self._stats = stats or PullStats()
+        # 离线模式只读取本地缓存, 不发出任何网络请求
+        self._offline = offline
 
         self._dir_flag = dir_flag
         self._access_key = access_key
 
         self._types_flag = True if types else False
 
+    @property
+    def request_stats(self) -> Dict[str, Any]:
+        """API calls, retries and rate limit budget of this hub's requests"""
+        return self._scheduler.stats
+
+    @property
+    def pull_stats(self) -> PullStats:
+        """Phase timings and file counters of this hub's pulls"""
+        return self._stats
+
+    def _request(
+        self, url: str, headers: Dict[str, str] | None = None, **kwargs: Any
+    ) -> requests.Response:
+        if self._offline:
+            raise ValueError(f"Unable to request {url} in the offline mode")
+        # 连接为多个客户端共享, 认证信息只随请求发送
+        if self._access_key:
+            headers = {"Authorization": f"token {self._access_key}", **(headers or {})}
+        return self._scheduler.get(self._transport, url, headers=headers, **kwargs)
+
+    def _get(
+        self, url: str, headers: Dict[str, str] | None = None
+    ) -> requests.Response:
+        """
+        GET an API resource, revalidating the cached copy with If-None-Match /
+        If-Modified-Since. 304 answers do not count against the GitHub rate limit.
+        """
+        if not self._http_cache:
+            return self._request(url, headers=headers)
+        if self._offline:
+            cached = self._http_cache.load(url, headers)
+            if cached is None:
+                raise ValueError(
+                    f"The response of {url} is not cached, pull once online to cache it"
+                )
+            return self._http_cache.to_response(cached)
+        return self._http_cache.fetch(self._request, url, headers)
+
+    def _worker_pool(self) -> ContextManager[Executor]:
+        if self._executor is not None:
+            return nullcontext(self._executor)
+        return ThreadPoolExecutor(max_workers=self._jobs)
+
+    @contextmanager
+    def _progress_bar(self, desc: str, total: int | None) -> Iterator[tqdm]:
+        """A progress bar of this pull, or the shared one of a batch pull grown by total"""
+        if self._progress is None:
+            with tqdm(desc=desc, unit="file", total=total) as progress:
+                yield progress
+            return
+        self._grow_progress(self._progress, total or 0)
+        yield self._progress
+
+    @staticmethod
+    def _grow_progress(progress: tqdm, count: int):
+        with progress.get_lock():
+            progress.total = (progress.total or 0) + count
+        progress.refresh()
+
     @property
     def _directory_path(self) -> str:
         if self._types_flag:
@@ -124,6 +305,11 @@ class GitPromptHub(AbstractPromptHub):
     def metafile_name(self) -> str:
         return self.project_name + ".yaml"
 
+    @property
+    def save_path(self) -> Path:
+        """The local directory the project is pulled into"""
+        return self._save_path
+
     @property
     def _save_path(self) -> Path:
         save_path = None
@@ -137,7 +323,7 @@ class GitPromptHub(AbstractPromptHub):
         repo_url = self.main_project
         github_api_url = self._platfrom.get("repos", "")
 
-        response = requests.get(github_api_url.format(repo_url=repo_url))
+        response = self._request(github_api_url.format(repo_url=repo_url))
         return response.status_code == 200
 
     def get_project_meta(self) -> Config:
@@ -145,56 +331,238 @@ class GitPromptHub(AbstractPromptHub):
         if self._types_flag:
             return self.get_remote_project_meta()
         meta_file = self._save_path.joinpath(self.metafile_name)
-        return PyYaml(meta_file).read_config_from_yaml()
+        try:
+            stat = meta_file.stat()
+            version = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            version = None
+        return self._cached_meta(
+            "local", version, PyYaml(meta_file).read_config_from_yaml
+        )
+
+    def get_remote_project_meta(self) -> Config | Any:
+        # 同一提交的 metafile 只获取和解析一次, 开始新的拉取时失效
+        return self._cached_meta(
+            "remote",
+            self._commit_sha,
+            self._fetch_remote_project_meta,
+        )
 
-    def get_remote_project_meta(
-        self, max_retries: int = MAX_RETRIES, retry_delay: int = RETRY_DELAY
+    def _cached_meta(
+        self, key: str, version: Any, load: Callable[[], Config | Any]
     ) -> Config | Any:
-        remote_file_path = ""
-        if not self.sub_project:
-            remote_file_path = self._platfrom.get("content", "").format(
-                repo_url=self.main_project, file_path=self.metafile_name
-            )
-        else:
+        """Return the parsed metafile cached for version, loading it on a miss"""
+        cached = self._meta_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        config = load()
+        if config is not None:
+            self._meta_cache[key] = (version, config)
+        return config
+
+    def _remote_metafile_url(self) -> str:
+        meta_file = self.metafile_name
+        if self.sub_project:
             meta_file = self.sub_project + "/" + self.metafile_name
-            remote_file_path = self._platfrom.get("content", "").format(
-                repo_url=self.main_project, file_path=meta_file
+        return self._platfrom.get("content", "").format(
+            repo_url=self.main_project, file_path=quote(meta_file)
+        )
+
+    def _fetch_remote_project_meta(self) -> Config | Any:
+        # raw 媒体类型直接返回文件内容, 一次请求即可获取 metafile
+        # 失败重试由 RequestScheduler 负责
+        try:
+            response = self._get(self._remote_metafile_url(), headers=RAW_HEADERS)
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch remote meta content, {e}")
+            return None
+        if response.status_code != 200:
+            logger.error(
+                f"Failed to fetch remote meta content, Status code: {response.status_code}"
             )
+            logger.debug(f"{response.text}")
+            return None
+        return PyYaml.read_config_from_str(str(response.content, "utf-8"))
 
-        for attempt in range(max_retries + 1):
-            response = self._session.get(remote_file_path)
+    def resolve_commit(self) -> str | None:
+        """The commit the remote branch points to now"""
+        self._commit_sha = None
+        return self._resolve_ref()
 
-            if response.status_code == 200:
-                content_obj = self._parse_github_response(response)
-                download_url = content_obj["download_url"]
-
-                response = self._session.get(download_url)
-                if response.status_code == 200:
-                    return PyYaml.read_config_from_str(str(response.content, "utf-8"))
-                else:
-                    logger.error(
-                        f"Failed to fetch remote meta content, Status code: {response.status_code}"
-                    )
-                    logger.debug(f"{response.text}")
-            else:
-                logger.warning(
-                    f"Failed to fetch remote meta content, Status code: {response.status_code}"
-                )
-                if attempt < max_retries:
-                    logger.warning(f"Retrying in {retry_delay} millisecond...")
-                    time.sleep(retry_delay / 1000)
-                else:
-                    logging.error(
-                        "Max retry attempts reached.\n Please check and try again"
-                    )
-                    break
+    def list_project_metafiles(self) -> List[Dict]:
+        """
+        The metafile <sub>/<sub>.yaml of every sub project in the repository,
+        listed at the resolved commit, with the "sub_project" of each.
+        """
+        items = self._list_github_tree("")
+        if items is None:
+            # 目录树被截断时只查找第一级目录下的子工程
+            root = self._list_github_directory("")
+            directories = [item["path"] for item in root if item["type"] == "dir"]
+            with self._worker_pool() as executor:
+                listings = executor.map(self._list_github_directory, directories)
+                items = [item for listing in [root, *listings] for item in listing]
 
-        return None
+        root_metafile = self.main_project.split("/")[1] + ".yaml"
+        metafiles: Dict[str, Dict] = {}
+        for item in sorted(items, key=lambda item: item["path"].count("/")):
+            parts = item["path"].split("/")
+            if parts[-1] != (parts[-2] + ".yaml" if len(parts) > 1 else root_metafile):
+                continue
+            sub_project = "/".join(parts[:-1])
+            # 子工程内与目录同名的 yaml Prompt 文件不是 metafile
+            if any(
+                "/".join(parts[:depth]) in metafiles for depth in range(1, len(parts) - 1)
+            ):
+                continue
+            metafiles[sub_project] = {**item, "sub_project": sub_project}
+        return list(metafiles.values())
+
+    def fetch_metafile(self, item: Dict) -> bytes | None:
+        """Content of a listed metafile, checked against its blob SHA"""
+        try:
+            response = self._request(item["download_url"])
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch {item['path']}, {e}")
+            return None
+        if response.status_code != 200:
+            logger.error(
+                f"Failed to fetch {item['path']}, Status code: {response.status_code}"
+            )
+            return None
+        if blob_sha(response.content) != item["sha"]:
+            logger.error(f"The fetched {item['path']} does not match the expected SHA value")
+            return None
+        return response.content
 
     def pull_project(self):
-        if not os.path.exists(self._save_path):
-            os.makedirs(self._save_path)
-        self._download_github_directory(self._directory_path, self._save_path)
+        plan = self.begin_pull()
+        succeeded = False
+        try:
+            tasks = self.prepare_pull(plan)
+            with self._stats.phase("download"), self._worker_pool() as executor:
+                self._run_tasks(plan, tasks, executor)
+            succeeded = True
+        finally:
+            self.finish_pull(succeeded)
+
+    def plan_pull(self) -> PullPlan:
+        """
+        Compute what pull_project would download, skip and delete, from the
+        remote listing and the hashes of the local files. Nothing is downloaded
+        or written.
+        """
+        self._load_pull_state()
+        directory_path = self._directory_path
+        save_directory = self._save_path
+        # 离线时只能由缓存的目录树和 Blob 缓存还原工程
+        mode = "tree" if self._offline else self._pull_mode()
+        plan = self._plan_pull(directory_path, save_directory, mode)
+        if plan is not None:
+            return plan
+
+        logger.warning(
+            "The repository tree is truncated, fall back to listing directory by directory"
+        )
+        with self._stats.phase("listing"):
+            items = self._list_github_contents(directory_path)
+        if mode == "archive":
+            return self._archive_plan(items, save_directory)
+        return self._diff_items(
+            items, save_directory, "contents", self._removed_files(items)
+        )
+
+    def begin_pull(self) -> PullPlan:
+        """
+        First step of a pull, for callers driving it step by step the way
+        pull_project does: plan = begin_pull(), then run every task returned
+        by prepare_pull(plan), concurrently or not, then finish_pull(succeeded)
+        whether the tasks succeeded or not.
+        """
+        os.makedirs(self._save_path, exist_ok=True)
+        return self.plan_pull()
+
+    def prepare_pull(self, plan: PullPlan) -> List[Callable[[], None]]:
+        """
+        Apply the local part of the plan: delete the files removed upstream,
+        record the verified files and remove the local files to be replaced.
+        Returns the download tasks, a single one extracting the repository
+        archive for an archive plan.
+        """
+        save_directory = self._save_path
+        save_paths = self._prepare_plan(plan, save_directory)
+        if plan.method == "archive":
+            return [
+                partial(
+                    self._download_github_archive,
+                    self._directory_path,
+                    save_directory,
+                    plan.download,
+                )
+            ]
+        return [
+            partial(
+                self._download_file,
+                item["download_url"],
+                item_save_path,
+                item["sha"],
+                item.get("size"),
+            )
+            for item, item_save_path in zip(plan.download, save_paths)
+        ]
+
+    def finish_pull(self, succeeded: bool):
+        """
+        Last step of a pull: save the manifest, recording the pulled commit
+        only when every file landed. Files that failed to download are then
+        reported as a ValueError, the next pull retries them.
+        """
+        completed = succeeded and not self._failed
+        if self._manifest is not None:
+            # 拉取中断或有文件下载失败时不记录提交, 下次拉取需要完整比对
+            self._manifest.commit = self._commit_sha if completed else None
+            self._manifest.save(self._save_path)
+        if completed:
+            # 拉取完成后剩余的残留文件已无用
+            shutil.rmtree(
+                self._save_path.joinpath(MANIFEST_DIR, PARTIAL_DIR), ignore_errors=True
+            )
+        if succeeded:
+            self._check_failures()
+
+    def _load_pull_state(self):
+        # 每次拉取重新解析一次远端分支对应的提交
+        self._commit_sha = None
+        self._meta_cache.pop("remote", None)
+        self._landed = {}
+        self._failed = []
+        self._manifest = Manifest.load(
+            self._save_path, self.main_project, self._directory_path
+        )
+
+    def _check_failures(self):
+        if not self._failed:
+            return
+        files = "\n".join(f"  {path}" for path in sorted(self._failed))
+        raise ValueError(
+            f"{len(self._failed)} files of {self.main_project} {self.sub_project} "
+            f"failed to download:\n{files}"
+        )
+
+    def _relative_path(self, save_path: str | Path) -> str:
+        return Path(save_path).relative_to(self._save_path).as_posix()
+
+    def _is_unchanged(self, save_path: str | Path, sha: str) -> bool:
+        """Check the manifest stat data, without hashing the file"""
+        if self._manifest is None:
+            return False
+        return self._manifest.is_unchanged(
+            self._relative_path(save_path), save_path, sha
+        )
+
+    def _record_file(self, save_path: str | Path, sha: str):
+        if self._manifest is not None:
+            self._manifest.record(self._relative_path(save_path), save_path, sha)
 
     def get_project_dependencies(self) -> List[Dict]:
         depend_list = []
@@ -231,95 +599,802 @@ class GitPromptHub(AbstractPromptHub):
     def _parse_github_response(self, response):
         return response.json()
 
-    def _download_github_directory(self, directory_path: str, save_directory: Path):
-        github_api_url = self._platfrom.get("content", "").format(
-            repo_url=self.main_project, file_path=directory_path
+    def _pull_mode(self) -> str:
+        if self._mode == "archive" and self._types_flag:
+            logger.warning(
+                "The archive mode only supports pulling the whole project, use tree mode instead"
+            )
+            return "tree"
+        return self._mode
+
+    def _plan_pull(
+        self, directory_path: str, save_directory: Path, mode: str
+    ) -> PullPlan | None:
+        """
+        List the remote files, incrementally against the manifest when possible,
+        and diff them with the local files. None means the repository tree was
+        truncated and the directories have to be listed one by one.
+        """
+        if self._offline:
+            return self._plan_offline(directory_path, save_directory)
+        if mode in ("auto", "tree"):
+            with self._stats.phase("listing"):
+                listing = self._list_changed_files(directory_path, save_directory)
+            if listing is not None:
+                items, removed = listing
+                return self._diff_items(items, save_directory, "tree", removed)
+
+        with self._stats.phase("listing"):
+            if mode == "contents":
+                items = self._list_github_contents(directory_path)
+            else:
+                items = self._list_github_tree(directory_path)
+        if items is None:
+            return None
+        if mode == "archive" or mode == "auto" and self._prefer_archive(items):
+            return self._archive_plan(items, save_directory)
+        return self._diff_items(
+            items,
+            save_directory,
+            mode if mode == "contents" else "tree",
+            self._removed_files(items),
         )
-        response = self._session.get(github_api_url)
 
-        if response.status_code == 200:
-            content_list = self._parse_github_response(response)
-            for item in tqdm(
-                content_list, desc=f"Downloading {directory_path}", unit="file"
-            ):
-                item_name = item["name"]
-                item_download_url = item["download_url"]
-                item_sha = item["sha"]
-                item_save_path = os.path.join(save_directory, item_name)
-
-                if item["type"] == "dir":
-                    # Recursively download subdirectories
-                    subdirectory_path = os.path.join(directory_path, item_name)
-                    subdirectory_save_path = save_directory.joinpath(item_name)
-                    if not os.path.exists(subdirectory_save_path):
-                        os.makedirs(subdirectory_save_path)
-                    self._download_github_directory(
-                        subdirectory_path, subdirectory_save_path
-                    )
-                else:
-                    self._download_file(item_download_url, item_save_path, item_sha)
-        else:
-            logger.error(
-                f"Failed to fetch directory content, Status code: {response.status_code}"
+    def _archive_plan(self, items: List[Dict], save_directory: Path) -> PullPlan:
+        # 压缩包解压时会重写目录下的全部文件
+        plan = PullPlan("archive", self._commit_sha)
+        plan.download = items
+        self._plan_deletes(plan, save_directory, self._removed_files(items))
+        return plan
+
+    def _removed_files(self, items: List[Dict]) -> List[str]:
+        """The files of the last pull missing from a full listing"""
+        if self._manifest is None:
+            return []
+        listed = {item["path"] for item in items}
+        return sorted(set(self._manifest.files) - listed)
+
+    def _plan_offline(self, directory_path: str, save_directory: Path) -> PullPlan:
+        """
+        Plan from the caches only: the commit and listings cached by earlier
+        online pulls, or the manifest when it is at the cached commit.
+        """
+        with self._stats.phase("listing"):
+            head_sha = self._resolve_ref()
+            if not head_sha:
+                raise ValueError(f"Unable to resolve the commit of {self.main_project} offline")
+            listing = None
+            if self._manifest is not None and self._manifest.commit == head_sha:
+                listing = self._list_changed_files(directory_path, save_directory)
+            if listing is None:
+                items = self._list_cached_tree(directory_path, head_sha)
+                listing = (items, self._removed_files(items))
+        items, removed = listing
+        return self._diff_items(items, save_directory, "tree", removed)
+
+    def _list_cached_tree(self, directory_path: str, head_sha: str) -> List[Dict]:
+        """
+        The tree listing at head_sha from the HTTP cache. Incremental pulls only
+        cache the comparisons between commits, so the listing is rebuilt from
+        the cached tree of an earlier commit and the comparisons leading to head.
+        """
+        chain = self._cached_compare_chain(head_sha)
+        if chain is None:
+            raise ValueError(
+                f"The repository tree at commit {head_sha[:7]} is not cached, "
+                "pull once online to cache it"
+            )
+        base_sha = chain[0][0] if chain else head_sha
+        items = self._list_tree_at(directory_path, base_sha)
+        if items is None:
+            raise ValueError(
+                "The cached repository tree is truncated, it can't be pulled offline"
             )
+        if not chain:
+            return items
+
+        prefix = self._path_prefix(directory_path)
+        files = {item["path"]: (item["sha"], item["size"]) for item in items}
+        for base, head in chain:
+            changes = self._compare_commits(base, head)
+            if changes is None:
+                raise ValueError(
+                    f"The cached comparison of {base[:7]}...{head[:7]} can't be applied "
+                    "offline, pull once online to cache the tree"
+                )
+            self._apply_changes(files, [], changes, prefix)
+        return [
+            self._raw_item(prefix + relative_path, prefix, sha, size, head_sha)
+            for relative_path, (sha, size) in files.items()
+        ]
+
+    def _cached_compare_chain(self, head_sha: str) -> List[Tuple[str, str]] | None:
+        """
+        The cached (base, head) comparisons from a commit whose tree is cached
+        to head_sha, oldest first. None when there is no such chain.
+        """
+        if self._http_cache.contains(self._tree_url(head_sha)):
+            return []
+        compare_url = self._platfrom.get("compare", "")
+        prefix = compare_url.split("{base}", 1)[0].format(repo_url=self.main_project)
+        bases: Dict[str, List[str]] = {}
+        for url in self._http_cache.urls(prefix):
+            base, _, head = url[len(prefix) :].partition("...")
+            bases.setdefault(head, []).append(base)
+
+        # 从 head 沿缓存的比较结果回溯, 直到一个目录树已缓存的提交
+        queue: List[Tuple[str, List[Tuple[str, str]]]] = [(head_sha, [])]
+        seen = {head_sha}
+        while queue:
+            sha, chain = queue.pop(0)
+            for base in bases.get(sha, []):
+                if base in seen:
+                    continue
+                seen.add(base)
+                base_chain = [(base, sha)] + chain
+                if self._http_cache.contains(self._tree_url(base)):
+                    return base_chain
+                queue.append((base, base_chain))
+        return None
+
+    def _check_offline_plan(self, plan: PullPlan):
+        """
+        Fail before changing any file when a blob to restore is not cached, or
+        the remote metafile read after pulling some types only.
+        """
+        if self._types_flag and not self._http_cache.contains(
+            self._remote_metafile_url(), RAW_HEADERS
+        ):
+            raise ValueError(
+                f"The metafile of {self.main_project} {self.sub_project} is not cached, "
+                "pull once online to cache it"
+            )
+        missing = [item for item in plan.download if item["sha"] not in plan.cached]
+        if not missing:
+            return
+        blobs = "\n".join(f"  {item['sha']}  {item['path']}" for item in missing)
+        raise ValueError(
+            f"{len(missing)} blobs of {self.main_project} {self.sub_project} are not in the "
+            f"blob cache, unable to pull offline:\n{blobs}"
+        )
+
+    def _diff_items(
+        self,
+        items: List[Dict],
+        save_directory: Path,
+        method: str,
+        removed: List[str] | None = None,
+    ) -> PullPlan:
+        """
+        Split the listed items into files to download and files already up to
+        date, checking the manifest stat data first and hashing the rest.
+        """
+        plan = PullPlan(method, self._commit_sha)
+        self._plan_deletes(plan, save_directory, removed or [])
+
+        save_paths = [
+            str(save_directory.joinpath(*item["path"].split("/"))) for item in items
+        ]
+        # 先与拉取清单比对, 文件大小和修改时间一致则无需计算哈希
+        unchanged = {
+            path
+            for item, path in zip(items, save_paths)
+            if self._is_unchanged(path, item["sha"])
+        }
+        if unchanged:
+            logger.info(f"{len(unchanged)} files unchanged since the last pull, skipping.")
+        # 并行计算其余本地已存在文件的哈希, 跳过内容一致的文件
+        with self._stats.phase("hashing"):
+            local_shas = hash_tree(
+                [
+                    path
+                    for path in save_paths
+                    if path not in unchanged and os.path.exists(path)
+                ],
+                self._jobs,
+            )
+
+        for item, item_save_path in zip(items, save_paths):
+            if item_save_path in unchanged:
+                plan.skip.append(item)
+                continue
+            local_sha = local_shas.get(item_save_path)
+            if local_sha == item["sha"]:
+                logger.info(
+                    f"File '{item_save_path}' already exists with matching SHA, skipping."
+                )
+                if item["size"] is None:
+                    item["size"] = os.path.getsize(item_save_path)
+                plan.skip.append(item)
+                plan.verified.append(item)
+                continue
+            if local_sha is not None:
+                plan.replace.add(item["path"])
+            plan.download.append(item)
+
+        if self._blob_cache:
+            plan.cached = {
+                item["sha"]
+                for item in plan.download
+                if self._blob_cache.contains(item["sha"])
+            }
+        return plan
+
+    @staticmethod
+    def _plan_deletes(plan: PullPlan, save_directory: Path, removed: List[str]):
+        for relative_path in removed:
+            local_path = save_directory.joinpath(*relative_path.split("/"))
+            plan.delete[relative_path] = (
+                local_path.stat().st_size if local_path.is_file() else None
+            )
+
+    def _list_github_contents(self, directory_path: str) -> List[Dict]:
+        """Every file below directory_path, listing the directories level by level"""
+        prefix = self._path_prefix(directory_path)
+        items = []
+        directories = [directory_path]
+        with self._worker_pool() as executor:
+            while directories:
+                listings = list(executor.map(self._list_github_directory, directories))
+                directories = []
+                for item in (item for listing in listings for item in listing):
+                    if item["type"] == "dir":
+                        directories.append(item["path"])
+                    elif item["path"].startswith(prefix):
+                        items.append({**item, "path": item["path"][len(prefix) :]})
+        return items
+
+    def _prefer_archive(self, items: List[Dict]) -> bool:
+        if self._types_flag:
+            return False
+        save_directory = self._save_path
+        missing = [
+            item
+            for item in items
+            if not self._is_unchanged(
+                save_directory.joinpath(*item["path"].split("/")), item["sha"]
+            )
+        ]
+        return len(missing) > self._archive_threshold
+
+    def _download_github_archive(
+        self,
+        directory_path: str,
+        save_directory: Path,
+        items: List[Dict] | None = None,
+    ):
+        """
+        Download the repository tarball once and stream-extract the entries below
+        directory_path. When the tree listing is known, every extracted file is
+        checked against its blob SHA.
+        """
+        import tarfile
+
+        github_api_url = self._platfrom.get("tarball", "").format(
+            repo_url=self.main_project, ref=self._resolve_ref() or "HEAD"
+        )
+        expected = {item["path"]: item["sha"] for item in items} if items else {}
+        prefix = self._path_prefix(directory_path)
+
+        with self._request(github_api_url, stream=True) as response:
+            if response.status_code != 200:
+                logger.debug(f"{response.text}")
+                raise ValueError(
+                    f"Failed to download the repository archive of {self.main_project}, "
+                    f"Status code: {response.status_code}"
+                )
+
+            progress = self._progress_bar(
+                f"Extracting {directory_path}", len(expected) or None
+            )
+            # 压缩包按网络读取的字节数计入传输量
+            raw = _CountingReader(response.raw)
+            try:
+                # "r|*" 以流的方式读取压缩包, 不会把整个压缩包载入内存
+                with tarfile.open(fileobj=raw, mode="r|*") as tar, progress as bar:
+                    for member in tar:
+                        if not member.isfile():
+                            continue
+                        # 压缩包内第一级目录为 {owner}-{repo}-{commit}
+                        member_path = member.name.split("/", 1)[-1]
+                        if not member_path.startswith(prefix):
+                            continue
+                        relative_path = member_path[len(prefix) :]
+                        parts = relative_path.split("/")
+                        if ".." in parts or relative_path.startswith("/"):
+                            logger.warning(f"Skip unsafe archive entry '{member.name}'")
+                            continue
+
+                        start = time.perf_counter()
+                        save_path = save_directory.joinpath(*parts)
+                        save_path.parent.mkdir(parents=True, exist_ok=True)
+                        hasher = BlobHasher(member.size)
+                        source = tar.extractfile(member)
+                        # 先解压到临时文件, 校验通过后改名, 中断时不会留下不完整的文件
+                        temp_path = self._temp_path()
+                        try:
+                            with open(temp_path, "wb") as file:
+                                while chunk := source.read(CHUNK_SIZE):
+                                    hasher.update(chunk)
+                                    file.write(chunk)
+
+                            sha = expected.get(relative_path)
+                            if sha and not hasher.matches(sha):
+                                raise ValueError(
+                                    f"The extracted {relative_path} file does not match the expected SHA value. \nPlease check and try again"
+                                )
+                            os.replace(temp_path, save_path)
+                        except BaseException:
+                            Path(temp_path).unlink(missing_ok=True)
+                            raise
+                        if self._blob_cache:
+                            self._blob_cache.put(hasher.hexdigest(), save_path)
+                        self._record_file(save_path, hasher.hexdigest())
+                        self._stats.file_fetched(
+                            relative_path, member.size, time.perf_counter() - start
+                        )
+                        logger.info(f"Extracted {member.name} to {save_path}")
+                        bar.update(1)
+            finally:
+                self._stats.add_transferred(raw.count)
+
+    def _resolve_ref(self, ref: str = "HEAD") -> str | None:
+        if self._commit_sha:
+            return self._commit_sha
+
+        github_api_url = self._platfrom.get("commit", "").format(
+            repo_url=self.main_project, ref=ref
+        )
+        response = self._get(
+            github_api_url, headers={"Accept": "application/vnd.github.sha"}
+        )
+        if response.status_code == 200:
+            self._commit_sha = response.text.strip()
+            return self._commit_sha
+
+        logger.error(f"Failed to resolve {ref}, Status code: {response.status_code}")
+        logger.debug(f"{response.text}")
+        return None
+
+    def _resolved_commit(self) -> str:
+        commit_sha = self._resolve_ref()
+        if not commit_sha:
+            raise ValueError(f"Unable to resolve the commit of {self.main_project}")
+        return commit_sha
+
+    def _list_github_tree(self, directory_path: str) -> List[Dict] | None:
+        """
+        List every file below directory_path with one recursive Git Trees call.
+        The items mimic the contents API, with "path" relative to directory_path.
+        None is returned when GitHub truncated the tree.
+        """
+        return self._list_tree_at(directory_path, self._resolved_commit())
+
+    def _tree_url(self, commit_sha: str) -> str:
+        return self._platfrom.get("tree", "").format(
+            repo_url=self.main_project, sha=commit_sha
+        )
+
+    def _list_tree_at(self, directory_path: str, commit_sha: str) -> List[Dict] | None:
+        response = self._get(self._tree_url(commit_sha))
+        if response.status_code != 200:
             logger.debug(f"{response.text}")
+            raise ValueError(
+                f"Failed to fetch the repository tree of {self.main_project}, "
+                f"Status code: {response.status_code}"
+            )
+
+        content_obj = self._parse_github_response(response)
+        if content_obj.get("truncated"):
+            return None
+
+        prefix = self._path_prefix(directory_path)
+        items = []
+        for entry in content_obj["tree"]:
+            if entry["type"] != "blob" or not entry["path"].startswith(prefix):
+                continue
+            items.append(
+                self._raw_item(
+                    entry["path"], prefix, entry["sha"], entry.get("size"), commit_sha
+                )
+            )
+        return items
+
+    def _list_changed_files(
+        self, directory_path: str, save_directory: Path
+    ) -> Tuple[List[Dict], List[str]] | None:
+        """
+        Incremental listing against the commit recorded in the manifest: the
+        manifest files updated with the changes between the two commits, and
+        the files removed upstream. None means a full listing is needed.
+        """
+        manifest = self._manifest
+        if manifest is None or not manifest.commit:
+            return None
+        head_sha = self._resolve_ref()
+        if not head_sha:
+            return None
+
+        prefix = self._path_prefix(directory_path)
+        files: Dict[str, Tuple[str, int | None]] = {
+            relative_path: (entry.sha, entry.size)
+            for relative_path, entry in manifest.files.items()
+        }
+        removed: List[str] = []
+        changed = 0
+        if head_sha != manifest.commit:
+            changes = self._compare_commits(manifest.commit, head_sha)
+            if changes is None:
+                return None
+            changed = self._apply_changes(files, removed, changes, prefix)
+
+        logger.info(f"{changed} files changed since commit {manifest.commit[:7]}")
+        return [
+            self._raw_item(prefix + relative_path, prefix, sha, size, head_sha)
+            for relative_path, (sha, size) in files.items()
+        ], removed
+
+    @staticmethod
+    def _apply_changes(
+        files: Dict[str, Tuple[str, int | None]],
+        removed: List[str],
+        changes: List[Dict],
+        prefix: str,
+    ) -> int:
+        """Update files with the compare API changes below prefix, returns their count"""
+        changed = 0
+        for file in changes:
+            previous = file.get("previous_filename")
+            if file["status"] == "renamed" and previous.startswith(prefix):
+                removed.append(previous[len(prefix) :])
+                files.pop(previous[len(prefix) :], None)
+            if not file["filename"].startswith(prefix):
+                continue
+            relative_path = file["filename"][len(prefix) :]
+            changed += 1
+            if file["status"] == "removed":
+                removed.append(relative_path)
+                files.pop(relative_path, None)
+            else:
+                files[relative_path] = (file["sha"], None)
+        return changed
+
+    def _compare_commits(self, base: str, head: str) -> List[Dict] | None:
+        """Files changed between two commits, in the compare API format"""
+        github_api_url = self._platfrom.get("compare", "").format(
+            repo_url=self.main_project, base=base, head=head
+        )
+        response = self._get(github_api_url)
+        if response.status_code != 200:
+            logger.warning(
+                f"Failed to compare with the last pulled commit, Status code: {response.status_code}"
+            )
+            return None
+        content_obj = self._parse_github_response(response)
+        # 三点比较列出的是合并基础到 head 的变化, 历史被改写时不能据此增量更新
+        if content_obj.get("status") not in ("ahead", "identical"):
+            logger.info(
+                f"Commit {head[:7]} is not ahead of the last pulled commit {base[:7]}, "
+                "pull the whole tree instead"
+            )
+            return None
+        files = content_obj.get("files", [])
+        if len(files) >= COMPARE_FILES_LIMIT:
+            logger.info("Too many changed files, pull the whole tree instead")
+            return None
+        return files
+
+    @staticmethod
+    def _path_prefix(directory_path: str) -> str:
+        return directory_path.strip("/") + "/" if directory_path else ""
+
+    def _raw_item(
+        self, path: str, prefix: str, sha: str, size: int | None, ref: str
+    ) -> Dict:
+        """A contents API like item, its "path" is relative to prefix"""
+        return {
+            "name": path.rsplit("/", 1)[-1],
+            "path": path[len(prefix) :],
+            "type": "file",
+            "sha": sha,
+            "size": size,
+            # 文件名中的 #, ? 和 % 等字符需转义
+            "download_url": self._platfrom.get("raw", "").format(
+                repo_url=self.main_project, ref=ref, file_path=quote(path)
+            ),
+        }
+
+    def _remove_file(self, save_directory: Path, relative_path: str):
+        save_path = save_directory.joinpath(*relative_path.split("/"))
+        if save_path.is_file():
+            os.remove(save_path)
+            logger.info(f"File '{save_path}' was removed from the Prompt Hub, rm the file.")
+        if self._manifest is not None:
+            self._manifest.forget(relative_path)
+        # 清理删除文件后留下的空目录
+        parent = save_path.parent
+        while (
+            parent != save_directory
+            and parent.is_dir()
+            and not any(parent.iterdir())
+        ):
+            parent.rmdir()
+            parent = parent.parent
+
+    def _prepare_plan(self, plan: PullPlan, save_directory: Path) -> List[str]:
+        """
+        Apply the local part of the plan: delete the files removed upstream,
+        record the verified files and remove the local files to be replaced.
+        The save paths of the files to download are returned.
+        """
+        if self._offline:
+            self._check_offline_plan(plan)
+        for relative_path in plan.delete:
+            self._remove_file(save_directory, relative_path)
+        for item in plan.verified:
+            self._record_file(
+                save_directory.joinpath(*item["path"].split("/")), item["sha"]
+            )
+        if plan.skip:
+            self._stats.file_skipped(len(plan.skip))
+
+        save_paths = []
+        for item in plan.download:
+            item_save_path = str(save_directory.joinpath(*item["path"].split("/")))
+            if item["path"] in plan.replace:
+                logger.info(f"File '{item_save_path}' not matching SHA, rm the file.")
+                os.remove(item_save_path)
+            os.makedirs(os.path.dirname(item_save_path), exist_ok=True)
+            save_paths.append(item_save_path)
+        return save_paths
+
+    def _run_tasks(
+        self, plan: PullPlan, tasks: List[Callable[[], None]], executor: Executor
+    ):
+        if plan.method == "archive":
+            # 压缩包流式解压, 由解压过程显示进度
+            for task in tasks:
+                task()
+            return
+
+        futures = [executor.submit(task) for task in tasks]
+        try:
+            with self._progress_bar(
+                f"Downloading {self._directory_path}", len(futures)
+            ) as progress:
+                for future in as_completed(futures):
+                    future.result()
+                    progress.update(1)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def _list_github_directory(self, directory_path: str) -> List[Dict]:
+        github_api_url = self._platfrom.get("content", "").format(
+            repo_url=self.main_project, file_path=quote(directory_path)
+        )
+        response = self._get(github_api_url)
+
+        if response.status_code == 200:
+            return self._parse_github_response(response)
+
+        logger.debug(f"{response.text}")
+        raise ValueError(
+            f"Failed to fetch the directory {directory_path} of {self.main_project}, "
+            f"Status code: {response.status_code}"
+        )
 
     def _download_file(
         self,
         url,
         save_path,
         sha,
-        max_retries: int = MAX_RETRIES,
-        retry_delay: int = RETRY_DELAY,
+        size: int | None = None,
     ):
+        start = time.perf_counter()
+        if self._is_unchanged(save_path, sha):
+            logger.info(f"File '{save_path}' unchanged since the last pull, skipping.")
+            self._stats.file_skipped()
+            return
         if os.path.exists(save_path):
             if self._check_file_sha(save_path, sha):
                 logger.info(
                     f"File '{save_path}' already exists with matching SHA, skipping."
                 )
+                self._record_file(save_path, sha)
+                self._stats.file_skipped()
                 return
             else:
                 logger.info(f"File '{save_path}' not matching SHA, rm the file.")
                 os.remove(save_path)
 
-        for attempt in range(max_retries + 1):
-            response = self._session.get(url)
-            if response.status_code == 200:
-                with open(save_path, "wb") as file:
-                    file.write(response.content)
-                logger.info(f"Downloaded {url} to {save_path}")
-                if not self._check_file_sha(save_path, sha):
-                    raise ValueError(
-                        f"The downloaded {url} file does not match the expected SHA value. \nPlease check and try again"
-                    )
+        # 内容相同的文件共用一个 Blob, 同一时刻只有一个线程写入它的续传文件
+        with self._blob_lock(sha):
+            if self._restore_blob(sha, save_path):
+                self._record_file(save_path, sha)
+                self._stats.cache_hit(os.path.getsize(save_path))
+                return
+
+            if not self._fetch_file(url, save_path, sha, size):
+                self._failed.append(self._relative_path(save_path))
             else:
-                logger.warning(
+                self._landed[sha] = save_path
+                if self._blob_cache:
+                    self._blob_cache.put(sha, save_path)
+                self._record_file(save_path, sha)
+                self._stats.file_fetched(
+                    self._relative_path(save_path),
+                    os.path.getsize(save_path),
+                    time.perf_counter() - start,
+                )
+
+    def _blob_lock(self, sha: str) -> ContextManager:
+        with self._blob_locks_lock:
+            return self._blob_locks.setdefault(sha, threading.Lock())
+
+    def _restore_blob(self, sha: str, save_path: str) -> bool:
+        """
+        Restore the blob without downloading it: copy the file with the same
+        content already written by this pull, or the blob cache entry.
+        """
+        landed = self._landed.get(sha)
+        temp_path = self._temp_path()
+        try:
+            restored = (
+                landed is not None and self._copy_file(landed, temp_path, sha)
+            ) or (
+                self._blob_cache is not None
+                and self._blob_cache.copy_to(sha, temp_path)
+            )
+            if restored:
+                os.replace(temp_path, save_path)
+                self._landed[sha] = save_path
+                return True
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+        return False
+
+    @staticmethod
+    def _copy_file(source: str | Path, dest: str | Path, sha: str) -> bool:
+        """Copy source to dest, checking the copied bytes against the blob SHA"""
+        try:
+            with open(source, "rb") as src, open(dest, "wb") as dst:
+                hasher = BlobHasher(os.fstat(src.fileno()).st_size)
+                while chunk := src.read(CHUNK_SIZE):
+                    hasher.update(chunk)
+                    dst.write(chunk)
+        except FileNotFoundError:
+            return False
+        return hasher.matches(sha)
+
+    def _partial_dir(self) -> Path:
+        partial_dir = self._save_path.joinpath(MANIFEST_DIR, PARTIAL_DIR)
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        return partial_dir
+
+    def _partial_path(self, sha: str) -> Path:
+        """
+        Where the downloaded blob is written before being renamed into place.
+        The name is the blob SHA, so bytes left by an interrupted pull can be
+        resumed; the caller holds the blob lock of sha.
+        """
+        return self._partial_dir().joinpath(sha + ".part")
+
+    def _temp_path(self) -> str:
+        """A new empty file in the partial directory, owned by one writer"""
+        fd, temp_path = tempfile.mkstemp(dir=self._partial_dir(), suffix=".tmp")
+        os.close(fd)
+        return temp_path
+
+    def _fetch_file(self, url: str, save_path: str, sha: str, size: int | None) -> bool:
+        part_path = self._partial_path(sha)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                if not self._fetch_partial(url, part_path, sha, size):
+                    return False
+                break
+            except (
+                requests.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                # 已写入的部分保留, 重试时从断点继续
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warning(f"Download of {url} interrupted, resuming. {e}")
+        os.replace(part_path, save_path)
+        logger.info(f"Downloaded {url} to {save_path}")
+        return True
+
+    def _fetch_partial(
+        self, url: str, part_path: Path, sha: str, size: int | None
+    ) -> bool:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if size is not None and offset >= size:
+            # 残留文件已不小于目标大小, 无法续传
+            offset = 0
+        headers = None
+        if offset:
+            # 压缩传输时范围对应压缩后的内容, 续传需请求未编码的原始字节
+            headers = {"Range": f"bytes={offset}-", "Accept-Encoding": "identity"}
+
+        # 限流与服务端错误由 RequestScheduler 退避重试
+        with self._request(url, headers=headers, stream=True) as response:
+            if response.status_code == 200:
+                self._write_response(response, url, part_path, sha, size)
+                return True
+            if response.status_code == 206 and self._range_start(response) == offset:
+                logger.info(f"Resuming {url} from byte {offset}")
+                try:
+                    self._write_response(response, url, part_path, sha, size, offset)
+                    return True
+                except (ValueError, requests.exceptions.ContentDecodingError):
+                    logger.warning(f"The resumed {url} file is corrupted, download it again")
+            elif response.status_code not in (206, 416):
+                logger.error(
                     f"Failed to download {url}, Status code: {response.status_code}"
                 )
-                if attempt < max_retries:
-                    logger.warning(f"Retrying in {retry_delay} millisecond...")
-                    time.sleep(retry_delay / 1000)
-                else:
-                    logging.error(
-                        "Max retry attempts reached.\n Please check and try again"
-                    )
-                    break
+                return False
+
+        # 残留文件损坏或与服务端返回的范围不一致, 丢弃后完整下载
+        part_path.unlink(missing_ok=True)
+        return self._fetch_partial(url, part_path, sha, size)
+
+    @staticmethod
+    def _range_start(response: requests.Response) -> int | None:
+        # Content-Range: bytes <start>-<end>/<total>
+        content_range = response.headers.get("Content-Range", "")
+        try:
+            return int(content_range.split()[1].split("-")[0])
+        except (IndexError, ValueError):
+            return None
+
+    def _write_response(
+        self,
+        response: requests.Response,
+        url: str,
+        part_path: Path,
+        sha: str,
+        size: int | None,
+        offset: int = 0,
+    ):
+        """
+        Stream the response body to part_path in chunks, feeding the git blob
+        hasher on the way so the file never has to be read back. When resuming
+        from offset, the bytes already on disk are hashed first.
+        """
+        hasher = BlobHasher(size) if size is not None else None
+        if hasher and offset:
+            with open(part_path, "rb") as file:
+                while chunk := file.read(CHUNK_SIZE):
+                    hasher.update(chunk)
+        transferred = 0
+        try:
+            with open(part_path, "ab" if offset else "wb") as file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if hasher:
+                        hasher.update(chunk)
+                    file.write(chunk)
+                    transferred += len(chunk)
+        finally:
+            self._stats.add_transferred(transferred)
+
+        if hasher:
+            verified = hasher.matches(sha)
+        else:
+            verified = self._check_file_sha(part_path, sha)
+        if not verified:
+            part_path.unlink(missing_ok=True)
+            raise ValueError(
+                f"The downloaded {url} file does not match the expected SHA value. \nPlease check and try again"
+            )
 
     def _check_file_sha(self, file_path: Path, sha) -> bool:
         current_sha = self._calculate_sha(file_path)
         return current_sha == sha
 
     def _calculate_sha(self, file_path: Path) -> str:
-        from hashlib import sha1
-
-        with open(file_path, "r") as f:
-            content = f.read()
-            sha1_obj = sha1()
-            content = content.encode()
-            content = b"blob %d\0" % len(content) + content
-            sha1_obj.update(content)
-            return sha1_obj.hexdigest()
-
+        return hash_file(file_path)
 
 if __name__ == "__main__":
     gitprompthub = GitPromptHub(
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+from pydantic import BaseModel, ValidationError
+
+from ssprompt.core.config import Config
+from ssprompt.core.prompthub.git_prompthub import GitPromptHub
+
+logger = logging.getLogger(__name__)
+
+"""
+    索引数据库结构的版本, 与已有数据库不一致时重建索引
+"""
+SCHEMA_VERSION = 1
+
+"""
+    Prompt 类型与 metafile 中对应的配置项
+"""
+PROMPT_TYPES = {
+    "text": "text_prompt",
+    "json": "json_prompt",
+    "yaml": "yaml_prompt",
+    "python": "python_prompt",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hubs (
+    main_project TEXT PRIMARY KEY,
+    commit_sha TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    main_project TEXT NOT NULL,
+    sub_project TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    name TEXT,
+    version TEXT,
+    description TEXT,
+    tags TEXT,
+    authors TEXT,
+    llms TEXT,
+    types TEXT,
+    meta TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (main_project, sub_project)
+);
+"""
+
+
+class IndexUpdate(BaseModel):
+    commit: str | None = None
+    added: List[str] = []
+    updated: List[str] = []
+    removed: List[str] = []
+    unchanged: int = 0
+    # 未通过 Config 校验的子工程 -> 错误信息
+    invalid: Dict[str, str] = {}
+    # 获取失败的子工程保留旧的索引, 下次更新时重试
+    failed: List[str] = []
+
+
+class PromptIndex:
+    """
+    Local SQLite index of the sub project metafiles of Prompt Hubs. Every row
+    keeps the blob SHA of its metafile, so an update only fetches the
+    metafiles whose SHA changed since the last one.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        # 多个 ssprompt 进程可能同时更新索引, 等待对方释放写锁
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._create_schema()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _create_schema(self):
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        with self._db:
+            if version != SCHEMA_VERSION:
+                self._db.executescript(
+                    "DROP TABLE IF EXISTS hubs; DROP TABLE IF EXISTS projects;"
+                )
+            self._db.executescript(_SCHEMA)
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def commit_of(self, main_project: str) -> str | None:
+        row = self._db.execute(
+            "SELECT commit_sha FROM hubs WHERE main_project = ?", (main_project,)
+        ).fetchone()
+        return row["commit_sha"] if row else None
+
+    def shas(self, main_project: str) -> Dict[str, str]:
+        """The metafile blob SHA of every indexed sub project"""
+        rows = self._db.execute(
+            "SELECT sub_project, sha FROM projects WHERE main_project = ?",
+            (main_project,),
+        )
+        return {row["sub_project"]: row["sha"] for row in rows}
+
+    def update(self, hub: GitPromptHub) -> IndexUpdate:
+        """
+        Refresh the sub projects of the hub's main project: list the metafiles
+        at the current commit, fetch the new and changed ones concurrently and
+        drop the sub projects removed upstream.
+        """
+        main_project = hub.main_project
+        result = IndexUpdate(commit=hub.resolve_commit())
+        if result.commit and result.commit == self.commit_of(main_project):
+            result.unchanged = len(self.shas(main_project))
+            return result
+
+        metafiles = hub.list_project_metafiles()
+        indexed = self.shas(main_project)
+        changed = [
+            item for item in metafiles if indexed.get(item["sub_project"]) != item["sha"]
+        ]
+        result.unchanged = len(metafiles) - len(changed)
+        listed = {item["sub_project"] for item in metafiles}
+        result.removed = sorted(set(indexed) - listed)
+
+        rows = []
+        with hub._worker_pool() as executor:
+            for item, content in zip(changed, executor.map(hub.fetch_metafile, changed)):
+                sub_project = item["sub_project"]
+                if content is None:
+                    result.failed.append(sub_project)
+                    continue
+                config, error = self._validate(content)
+                if error:
+                    logger.info(f"Invalid metafile {item['path']}: {error}")
+                    result.invalid[sub_project] = error
+                elif sub_project in indexed:
+                    result.updated.append(sub_project)
+                else:
+                    result.added.append(sub_project)
+                rows.append(self._row(main_project, item, config, error))
+
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO projects VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.executemany(
+                "DELETE FROM projects WHERE main_project = ? AND sub_project = ?",
+                [(main_project, sub_project) for sub_project in result.removed],
+            )
+            # 有获取失败的 metafile 时不记录提交, 下次更新重新比对
+            self._db.execute(
+                "INSERT OR REPLACE INTO hubs VALUES (?, ?, ?)",
+                (main_project, None if result.failed else result.commit, time.time()),
+            )
+        return result
+
+    @staticmethod
+    def _validate(content: bytes) -> Tuple[Config | None, str | None]:
+        try:
+            data = yaml.safe_load(content)
+            if not isinstance(data, dict):
+                return None, "The metafile is not a mapping"
+            return Config(**data), None
+        except (yaml.YAMLError, ValidationError, TypeError, UnicodeDecodeError) as e:
+            return None, str(e).replace("\n", " ")
+
+    @staticmethod
+    def _row(
+        main_project: str, item: Dict, config: Config | None, error: str | None
+    ) -> Tuple[Any, ...]:
+        columns: Dict[str, Any] = dict.fromkeys(
+            ["name", "version", "description", "tags", "authors", "llms", "types", "meta"]
+        )
+        if config is not None:
+            meta = config.meta
+            columns.update(
+                name=meta.name,
+                version=meta.version,
+                description=meta.description,
+                tags=" ".join(meta.tag),
+                authors=" ".join(meta.author),
+                llms=" ".join(meta.llm),
+                types=" ".join(
+                    name for name, key in PROMPT_TYPES.items() if getattr(config, key)
+                ),
+                meta=config.json(ensure_ascii=False),
+            )
+        return (
+            main_project,
+            item["sub_project"],
+            item["path"],
+            item["sha"],
+            *columns.values(),
+            error,
+            time.time(),
+        )
+
+    def search(
+        self, query: str = "", main_project: str | None = None, limit: int | None = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Valid sub projects whose name, sub project, description, tags or LLMs
+        contain every word of the query, case insensitive.
+        """
+        clauses = ["error IS NULL"]
+        params: List[Any] = []
+        if main_project:
+            clauses.append("main_project = ?")
+            params.append(main_project)
+        for word in query.split():
+            clauses.append(
+                "(name || ' ' || sub_project || ' ' || description || ' ' || tags "
+                "|| ' ' || llms) LIKE ? ESCAPE '\\'"
+            )
+            escaped = word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+
+        sql = (
+            "SELECT * FROM projects WHERE "
+            + " AND ".join(clauses)
+            + " ORDER BY main_project, sub_project"
+        )
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._db.execute(sql, params)]
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self) -> PromptIndex:
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
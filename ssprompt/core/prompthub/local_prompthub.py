@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import IO, Any, Dict, List
+
+from pydantic import PrivateAttr
+
+from ssprompt.core.cache import BlobCache
+from ssprompt.core.config import Config, PyYaml
+from ssprompt.core.prompthub.git_prompthub import (
+    CHUNK_SIZE,
+    DEFAULT_JOBS,
+    GitPromptHub,
+)
+from ssprompt.utils.githash import BlobHasher
+
+logger = logging.getLogger(__name__)
+
+
+class _CatFileBatch:
+    """A long running `git cat-file --batch` process streaming blobs by SHA"""
+
+    def __init__(self, mirror: Path) -> None:
+        self._process = subprocess.Popen(
+            ["git", "-C", str(mirror), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def copy_blob(self, sha: str, file: IO[bytes]) -> BlobHasher:
+        stdin, stdout = self._process.stdin, self._process.stdout
+        stdin.write(sha.encode() + b"\n")
+        stdin.flush()
+        header = stdout.readline().split()
+        if len(header) != 3 or header[1] != b"blob":
+            raise ValueError(f"The blob {sha} is missing in the local Prompt Hub")
+
+        remaining = int(header[2])
+        hasher = BlobHasher(remaining)
+        while remaining:
+            chunk = stdout.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ValueError(f"Unexpected end of blob {sha}")
+            hasher.update(chunk)
+            file.write(chunk)
+            remaining -= len(chunk)
+        # 每个对象内容后跟一个换行符
+        stdout.read(1)
+        return hasher
+
+    def close(self):
+        self._process.stdin.close()
+        self._process.wait()
+
+
+class LocalGitPromptHub(GitPromptHub):
+    """
+    Prompt Hub served from a local bare clone or mirror, eg. /srv/PromptHub.git.
+    Trees and blobs are read with git plumbing (ls-tree, diff-tree and
+    cat-file --batch), so pulls run at disk speed and work offline.
+    """
+
+    _mirror: Path = PrivateAttr()
+    _ref: str = PrivateAttr()
+    _batch_local: Any = PrivateAttr()
+    _batches: List[_CatFileBatch] = PrivateAttr()
+    _batches_lock: Any = PrivateAttr()
+
+    platform: Dict[str, Dict[Any, Any]] = {"local": {}}
+
+    def __init__(
+        self,
+        main_project: str,
+        sub_project: str,
+        mirror: Path,
+        types: str = "",
+        typedir: str = "",
+        path: Path = Path("."),
+        dir_flag: bool = True,
+        jobs: int = DEFAULT_JOBS,
+        blob_cache: BlobCache | None = None,
+        ref: str = "HEAD",
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            "local",
+            main_project,
+            sub_project,
+            "",
+            types,
+            typedir,
+            path,
+            dir_flag,
+            jobs,
+            mode="tree",
+            blob_cache=blob_cache,
+            **kwargs,
+        )
+        if not mirror.is_dir():
+            raise ValueError(f"The local Prompt Hub '{mirror}' isn't directory")
+        self._mirror = mirror
+        self._ref = ref
+        self._batch_local = threading.local()
+        self._batches = []
+        self._batches_lock = threading.Lock()
+
+    def _git(self, *args: str) -> bytes:
+        try:
+            return subprocess.run(
+                ["git", "-C", str(self._mirror), *args],
+                capture_output=True,
+                check=True,
+            ).stdout
+        except FileNotFoundError:
+            raise ValueError("Git not installed, the local Prompt Hub needs git")
+
+    def check_project_exists(self) -> bool:
+        try:
+            self._git("cat-file", "-e", f"{self._ref}:{self.sub_project}")
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    def _fetch_remote_project_meta(self) -> Config | Any:
+        meta_file = (
+            self.sub_project + "/" + self.metafile_name
+            if self.sub_project
+            else self.metafile_name
+        )
+        try:
+            content = self._git("cat-file", "blob", f"{self._ref}:{meta_file}")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to read {meta_file} from the local Prompt Hub")
+            logger.debug(e.stderr)
+            return None
+        return PyYaml.read_config_from_str(str(content, "utf-8"))
+
+    def _resolve_ref(self, ref: str | None = None) -> str | None:
+        if self._commit_sha:
+            return self._commit_sha
+        ref = ref if ref and ref != "HEAD" else self._ref
+        try:
+            self._commit_sha = (
+                self._git("rev-parse", "--verify", f"{ref}^{{commit}}").decode().strip()
+            )
+        except subprocess.CalledProcessError:
+            logger.error(f"Failed to resolve {ref} in the local Prompt Hub")
+            return None
+        return self._commit_sha
+
+    def _list_github_tree(self, directory_path: str) -> List[Dict] | None:
+        return self._ls_tree(directory_path)
+
+    def _ls_tree(self, directory_path: str, sizes: bool = True) -> List[Dict]:
+        """List the files below directory_path, with their sizes when sizes is set"""
+        commit_sha = self._resolved_commit()
+        prefix = self._path_prefix(directory_path)
+        pathspec = ["--", prefix] if prefix else []
+        long_format = ["-l"] if sizes else []
+        output = self._git("ls-tree", "-r", *long_format, "-z", commit_sha, *pathspec)
+
+        items = []
+        for record in output.decode().split("\0"):
+            if not record:
+                continue
+            meta, file_path = record.split("\t", 1)
+            # "<mode> <type> <sha>", 带 -l 时还有 "<size>"
+            fields = meta.split()
+            object_type, sha = fields[1], fields[2]
+            if object_type != "blob" or not file_path.startswith(prefix):
+                continue
+            size = int(fields[3]) if len(fields) > 3 else None
+            items.append(self._raw_item(file_path, prefix, sha, size, commit_sha))
+        return items
+
+    def _compare_commits(self, base: str, head: str) -> List[Dict] | None:
+        try:
+            output = self._git("diff-tree", "-r", "-z", "--no-renames", base, head)
+        except subprocess.CalledProcessError:
+            # 上次拉取的提交已不在镜像中
+            return None
+
+        files = []
+        # 输出格式: ":<old mode> <new mode> <old sha> <new sha> <status>\0<path>\0"
+        tokens = output.decode().split("\0")
+        for meta, file_path in zip(tokens[0::2], tokens[1::2]):
+            if not meta.startswith(":"):
+                continue
+            _, _, _, sha, status = meta[1:].split()
+            files.append(
+                {
+                    "filename": file_path,
+                    "status": "removed" if status == "D" else "modified",
+                    "sha": sha,
+                }
+            )
+        return files
+
+    def _raw_item(
+        self, path: str, prefix: str, sha: str, size: int | None, ref: str
+    ) -> Dict:
+        item = super()._raw_item(path, prefix, sha, size, ref)
+        item["download_url"] = f"{self._mirror}:{path}"
+        return item
+
+    def fetch_metafile(self, item: Dict) -> bytes | None:
+        try:
+            return self._git("cat-file", "blob", item["sha"])
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to read {item['path']} from the local Prompt Hub")
+            logger.debug(e.stderr)
+            return None
+
+    def _fetch_file(self, url: str, save_path: str, sha: str, size: int | None) -> bool:
+        temp_path = self._temp_path()
+        try:
+            with open(temp_path, "wb") as file:
+                hasher = self._batch().copy_blob(sha, file)
+            if not hasher.matches(sha):
+                raise ValueError(
+                    f"The {url} file does not match the expected SHA value. \nPlease check and try again"
+                )
+            os.replace(temp_path, save_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        self._stats.add_transferred(hasher.count)
+        logger.info(f"Copied {url} to {save_path}")
+        return True
+
+    def _batch(self) -> _CatFileBatch:
+        # 每个下载线程使用自己的 cat-file 进程
+        batch = getattr(self._batch_local, "batch", None)
+        if batch is None:
+            batch = _CatFileBatch(self._mirror)
+            self._batch_local.batch = batch
+            with self._batches_lock:
+                self._batches.append(batch)
+        return batch
+
+    def finish_pull(self, succeeded: bool):
+        with self._batches_lock:
+            for batch in self._batches:
+                batch.close()
+            self._batches.clear()
+        self._batch_local = threading.local()
+        super().finish_pull(succeeded)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from hashlib import sha1
+from pathlib import Path
+from typing import Dict
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+"""
+    拉取清单的保存位置, 相对于工程保存目录
+"""
+MANIFEST_DIR = ".ssprompt"
+
+"""
+    拉取清单文件名, 同一目录下可按不同类型拉取, 每个远端目录各有一份清单
+"""
+MANIFEST_FILE = "manifest-{key}.json"
+
+
+class ManifestEntry(BaseModel):
+    sha: str
+    size: int
+    mtime_ns: int
+
+
+class Manifest(BaseModel):
+    """
+    Record of the last pull: the resolved commit and, for every pulled file,
+    its blob SHA plus the size and mtime it had on disk afterwards. A file
+    whose stat data still matches is known to be intact without hashing it.
+    A save path keeps one manifest per pulled remote directory.
+    """
+
+    main_project: str
+    directory: str
+    commit: str | None = None
+    files: Dict[str, ManifestEntry] = {}
+
+    @staticmethod
+    def path_of(save_path: Path, main_project: str, directory: str) -> Path:
+        key = sha1(f"{main_project}\n{directory}".encode()).hexdigest()[:16]
+        return save_path.joinpath(MANIFEST_DIR, MANIFEST_FILE.format(key=key))
+
+    @classmethod
+    def load(cls, save_path: Path, main_project: str, directory: str) -> Manifest:
+        """Load the manifest of directory, or an empty one if it is missing or stale"""
+        manifest_path = cls.path_of(save_path, main_project, directory)
+        try:
+            manifest = cls.parse_file(manifest_path)
+        except FileNotFoundError:
+            manifest = None
+        except (ValidationError, ValueError) as e:
+            logger.warning(f"Ignore the broken manifest '{manifest_path}'")
+            logger.debug(e)
+            manifest = None
+
+        if (
+            manifest is None
+            or manifest.main_project != main_project
+            or manifest.directory != directory
+        ):
+            return cls(main_project=main_project, directory=directory)
+        return manifest
+
+    def save(self, save_path: Path):
+        manifest_path = self.path_of(save_path, self.main_project, self.directory)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=manifest_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            file.write(self.json(indent=2, sort_keys=True))
+        os.replace(tmp_path, manifest_path)
+
+    def is_unchanged(self, relative_path: str, local_path: str | Path, sha: str) -> bool:
+        entry = self.files.get(relative_path)
+        if entry is None or entry.sha != sha:
+            return False
+        try:
+            stat = os.stat(local_path)
+        except FileNotFoundError:
+            return False
+        return stat.st_size == entry.size and stat.st_mtime_ns == entry.mtime_ns
+
+    def record(self, relative_path: str, local_path: str | Path, sha: str):
+        stat = os.stat(local_path)
+        self.files[relative_path] = ManifestEntry(
+            sha=sha, size=stat.st_size, mtime_ns=stat.st_mtime_ns
+        )
+
+    def forget(self, relative_path: str):
+        self.files.pop(relative_path, None)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set
+
+
+class PullPlan:
+    """
+    What a pull changes in the local project, computed from the remote listing
+    and the local files only: the files to download, to skip because they are
+    up to date, and to delete because they were removed upstream. A pull
+    applies the plan, a dry run only reports it.
+    """
+
+    def __init__(self, method: str, commit: str | None = None) -> None:
+        # tree: 逐个文件下载, archive: 下载压缩包解压全部文件, contents: 逐级遍历目录
+        self.method = method
+        self.commit = commit
+        # 列表项与 contents API 格式一致, "path" 相对于拉取目录
+        self.download: List[Dict] = []
+        self.skip: List[Dict] = []
+        # 计算哈希后确认一致的文件, 需要写入拉取清单
+        self.verified: List[Dict] = []
+        # 本地已存在但内容不一致, 下载前删除的文件
+        self.replace: Set[str] = set()
+        # 远端已删除的文件 -> 本地文件大小, 本地不存在时为 None
+        self.delete: Dict[str, int | None] = {}
+        # Blob 缓存中已有的文件 SHA, 无需网络传输
+        self.cached: Set[str] = set()
+
+    @property
+    def download_bytes(self) -> int:
+        return sum(item["size"] or 0 for item in self.download)
+
+    @property
+    def transfer_bytes(self) -> int:
+        """Bytes to download, leaving out the blobs restored from the cache"""
+        return sum(
+            item["size"] or 0
+            for item in self.download
+            if item["sha"] not in self.cached
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """The plan as a JSON serializable dict"""
+        deleted = {path: size for path, size in self.delete.items() if size is not None}
+        return {
+            "method": self.method,
+            "commit": self.commit,
+            "download": {
+                "files": len(self.download),
+                "bytes": self.download_bytes,
+                "unknown_sizes": sum(1 for item in self.download if item["size"] is None),
+                "cached": sum(1 for item in self.download if item["sha"] in self.cached),
+                "replace": len(self.replace),
+                "paths": sorted(item["path"] for item in self.download),
+            },
+            "skip": {
+                "files": len(self.skip),
+                "bytes": sum(item["size"] or 0 for item in self.skip),
+            },
+            "delete": {
+                "files": len(deleted),
+                "bytes": sum(deleted.values()),
+                "paths": sorted(deleted),
+            },
+            "transfer_bytes": self.transfer_bytes,
+        }
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+"""
+    拉取报告中列出的最慢文件数
+"""
+SLOWEST_FILES = 10
+
+"""
+    报告中各阶段的输出顺序
+"""
+PHASES = ["listing", "hashing", "download", "dependencies", "install"]
+
+
+class PullStats:
+    """
+    Thread safe counters and timings of one pull, or of every project of a
+    batch pull: wall time per phase, files fetched, skipped or restored from the
+    blob cache, bytes transferred and the slowest file downloads.
+    """
+
+    def __init__(self, slowest: int = SLOWEST_FILES) -> None:
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._slowest = slowest
+        self._phases: Dict[str, float] = {}
+        self._fetched = 0
+        self._skipped = 0
+        self._cache_hits = 0
+        self._transferred = 0
+        self._written = 0
+        # 最小堆, 只保留耗时最长的若干文件
+        self._slowest_files: List[Tuple[float, str, int]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0.0) + elapsed
+
+    def file_fetched(self, path: str, size: int, seconds: float):
+        with self._lock:
+            self._fetched += 1
+            self._written += size
+            record = (seconds, path, size)
+            if len(self._slowest_files) < self._slowest:
+                heapq.heappush(self._slowest_files, record)
+            elif self._slowest_files and record > self._slowest_files[0]:
+                heapq.heapreplace(self._slowest_files, record)
+
+    def file_skipped(self, count: int = 1):
+        with self._lock:
+            self._skipped += count
+
+    def cache_hit(self, size: int):
+        with self._lock:
+            self._cache_hits += 1
+            self._written += size
+
+    def add_transferred(self, size: int):
+        with self._lock:
+            self._transferred += size
+
+    def report(self, request_stats: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """The report as a JSON serializable dict"""
+        with self._lock:
+            phases = {
+                name: round(self._phases[name], 3)
+                for name in PHASES + sorted(set(self._phases) - set(PHASES))
+                if name in self._phases
+            }
+            return {
+                "wall_time": round(time.perf_counter() - self._started, 3),
+                "phases": phases,
+                "files": {
+                    "fetched": self._fetched,
+                    "skipped": self._skipped,
+                    "cache_hits": self._cache_hits,
+                },
+                "bytes": {
+                    "transferred": self._transferred,
+                    "written": self._written,
+                },
+                "requests": dict(request_stats or {}),
+                "slowest_files": [
+                    {"path": path, "seconds": round(seconds, 3), "bytes": size}
+                    for seconds, path, size in sorted(self._slowest_files, reverse=True)
+                ],
+            }
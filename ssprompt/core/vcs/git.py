@@ -19,6 +19,10 @@ class GitConfig:
     @property
     def email(self) -> str:
         return  self._config_data["user"]["email"] 
+
+    @property
+    def installed(self) -> bool:
+        return self._git_installed()
     
     def _git_installed(self):
         try:
@@ -3,9 +3,12 @@ from __future__ import annotations
 import subprocess
 from importlib import metadata
 import logging
-import requests
 import re
 
+import requests
+
+from ssprompt.core.cache import HttpCache
+from ssprompt.core.http import Transport, get_transport
 from ssprompt.repositories.abstract_repository import AbstractRepository
 
 
@@ -17,16 +20,26 @@ class PyPiRepository(AbstractRepository):
         self,
         url="https://pypi.org/pypi",
         index="https://pypi.tuna.tsinghua.edu.cn/simple",
+        transport: Transport | None = None,
+        http_cache: HttpCache | None = None,
     ):
         self._base_url = url
         self._index = index
+        self._transport = transport or get_transport()
+        # 包的 JSON 元数据带有 ETag, 缓存后以条件请求重新验证
+        self._http_cache = http_cache
+
+    def _get(self, url: str) -> requests.Response:
+        if not self._http_cache:
+            return self._transport.get(url)
+        return self._http_cache.fetch(self._transport.get, url)
 
     def check_package_exists(self, name: str, version: str | None = None) -> bool:
         package = f"/{name}/json"
         if version:
             package = f"/{name}/{version}/json"
         print(self._base_url + package)
-        response = requests.get(self._base_url + package)
+        response = self._get(self._base_url + package)
         if response.status_code == 404:
             return False
         return True
@@ -104,7 +117,7 @@ class PyPiRepository(AbstractRepository):
 
     def get_available_versions(self, package_name):
         url = self._base_url + f"/{package_name}/json"
-        response = requests.get(url)
+        response = self._get(url)
 
         if response.status_code == 200:
             data = response.json()
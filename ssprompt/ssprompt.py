@@ -1,6 +1,12 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
+
+from ssprompt.core.cache import BlobCache, FileCache, HttpCache, parse_size
+from ssprompt.core.cache.blob_cache import DEFAULT_MAX_SIZE
+from ssprompt.core.http import Transport, get_transport
+from ssprompt.core.http.transport import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
 
 
 class Ssprompt:
@@ -19,6 +25,60 @@ class Ssprompt:
         """
         self._retry_delay = 200
 
+        """
+        本地缓存目录, 默认为 ~/.cache/ssprompt
+        """
+        self._cache_dir = Path(
+            os.environ.get("SSPROMPT_CACHE_DIR")
+            or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+            / "ssprompt"
+        )
+
+        """
+        本地缓存大小上限, 超出后按最近最少使用淘汰, eg. 512M.
+        Blob缓存单独受该上限约束, 拉取后所有缓存合计也受该上限约束
+        """
+        self._cache_max_size = parse_size(
+            os.environ.get("SSPROMPT_CACHE_MAX_SIZE") or DEFAULT_MAX_SIZE
+        )
+
+        """
+        命中缓存时使用硬链接代替复制
+        """
+        self._cache_link = os.environ.get("SSPROMPT_CACHE_LINK", "") in ("1", "on")
+
+        """
+        每个主机保持的 keep-alive 连接数
+        """
+        self._http_pool_size = int(
+            os.environ.get("SSPROMPT_HTTP_POOL_SIZE") or DEFAULT_POOL_SIZE
+        )
+
+        """
+        HTTP 请求超时时间(s), 连接与读取使用相同的值, eg. 30
+        """
+        timeout = os.environ.get("SSPROMPT_HTTP_TIMEOUT")
+        self._http_timeout = (float(timeout), float(timeout)) if timeout else DEFAULT_TIMEOUT
+
+        self._transport: Transport | None = None
+
+        """
+        本地 PromptHub 镜像路径, 使用 --platform local 时读取
+        """
+        self._local_mirror = os.environ.get("SSPROMPT_LOCAL_MIRROR", "")
+
+        """
+        命令性能分析结果(pstats)的保存路径, 设置后每个命令都在 cProfile 下运行
+        """
+        self._profile_path = os.environ.get("SSPROMPT_PROFILE", "")
+
+        """
+        Prompt Hub 子工程元数据索引(SQLite)的路径, 默认位于本地缓存目录
+        """
+        self._index_path = Path(
+            os.environ.get("SSPROMPT_INDEX_PATH") or self._cache_dir.joinpath("index.db")
+        )
+
     @property
     def github_access_key(self) -> str:
         return self._github_access_key
@@ -30,3 +90,66 @@ class Ssprompt:
     @property
     def retry_delay(self) -> int:
         return self._retry_delay
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir
+
+    @property
+    def cache_max_size(self) -> int:
+        return self._cache_max_size
+
+    @property
+    def cache_link(self) -> bool:
+        return self._cache_link
+
+    @property
+    def blob_cache(self) -> BlobCache:
+        return BlobCache(
+            self._cache_dir.joinpath("blobs"), self._cache_max_size, self._cache_link
+        )
+
+    @property
+    def http_cache(self) -> HttpCache:
+        return HttpCache(self._cache_dir.joinpath("http"))
+
+    @property
+    def pypi_cache(self) -> HttpCache:
+        return HttpCache(self._cache_dir.joinpath("pypi"))
+
+    @property
+    def caches(self) -> dict[str, FileCache]:
+        """本地缓存: 下载的 Blob, GitHub API 响应和 PyPI 包元数据"""
+        return {
+            "blobs": self.blob_cache,
+            "http": self.http_cache,
+            "pypi": self.pypi_cache,
+        }
+
+    @property
+    def http_pool_size(self) -> int:
+        return self._http_pool_size
+
+    @property
+    def http_timeout(self) -> tuple[float, float]:
+        return self._http_timeout
+
+    @property
+    def transport(self) -> Transport:
+        """所有命令共享的 HTTP 连接池"""
+        if self._transport is None:
+            self._transport = get_transport()
+            self._transport.configure(self._http_pool_size, self._http_timeout)
+        return self._transport
+
+    @property
+    def local_mirror(self) -> str:
+        return self._local_mirror
+
+    @property
+    def profile_path(self) -> str:
+        return self._profile_path
+
+    @property
+    def index_path(self) -> Path:
+        return self._index_path
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from pathlib import Path
+from typing import Dict, Iterable
+
+"""
+    分块读取文件的块大小(bytes)
+"""
+CHUNK_SIZE = 64 * 1024
+
+"""
+    超过该大小(bytes)的文件通过 mmap 计算哈希
+"""
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+
+class BlobHasher:
+    """
+    Incremental git blob SHA-1, eg. the value of `git hash-object`.
+    The blob size is part of the hashed header, so it must be known up front.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._count = 0
+        self._sha1 = sha1(b"blob %d\0" % size)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def update(self, chunk: bytes):
+        self._count += len(chunk)
+        self._sha1.update(chunk)
+
+    def hexdigest(self) -> str:
+        return self._sha1.hexdigest()
+
+    def matches(self, sha: str) -> bool:
+        return self._count == self._size and self.hexdigest() == sha
+
+
+def blob_sha(content: bytes) -> str:
+    hasher = BlobHasher(len(content))
+    hasher.update(content)
+    return hasher.hexdigest()
+
+
+def hash_file(path: str | Path) -> str:
+    """
+    Git blob SHA-1 of a local file, computed over its raw bytes so binary and
+    CRLF files hash exactly like `git hash-object`.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        hasher = BlobHasher(size)
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+        else:
+            while chunk := file.read(CHUNK_SIZE):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def hash_tree(paths: Iterable[str | Path], jobs: int = 8) -> Dict[str, str]:
+    """
+    Hash many local files on a thread pool. hashlib releases the GIL while
+    hashing, so large trees scale with the number of threads.
+    Files that do not exist are left out of the result.
+    """
+
+    def _hash(path: str) -> str | None:
+        try:
+            return hash_file(path)
+        except FileNotFoundError:
+            return None
+
+    paths = [str(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        shas = executor.map(_hash, paths)
+        return {path: sha for path, sha in zip(paths, shas) if sha is not None}
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from ssprompt.core.cache import BlobCache, evict_lru
+from ssprompt.utils.githash import blob_sha
+
+CONTENT = b"a cached prompt"
+SHA = blob_sha(CONTENT)
+
+
+def cached_blob(tmp_path: Path, link: bool = False) -> BlobCache:
+    cache = BlobCache(tmp_path / "blobs", link=link)
+    source = tmp_path / "source"
+    source.write_bytes(CONTENT)
+    cache.put(SHA, source)
+    return cache
+
+
+def test_copy_to_restores_the_blob(tmp_path: Path):
+    cache = cached_blob(tmp_path)
+    assert cache.copy_to(SHA, tmp_path / "dest")
+    assert (tmp_path / "dest").read_bytes() == CONTENT
+
+
+def test_modified_linked_entry_is_not_restored(tmp_path: Path):
+    cache = cached_blob(tmp_path, link=True)
+    linked = tmp_path / "linked"
+    assert cache.copy_to(SHA, linked)
+    assert os.path.samefile(linked, cache.get(SHA))
+
+    # 原地修改工程文件会同时修改共享的缓存条目
+    with open(linked, "r+b") as file:
+        file.write(b"edited")
+    assert not cache.copy_to(SHA, tmp_path / "other")
+    assert not cache.contains(SHA)
+
+
+def test_hit_keeps_the_mtime_of_linked_files(tmp_path: Path):
+    cache = cached_blob(tmp_path, link=True)
+    linked = tmp_path / "linked"
+    cache.copy_to(SHA, linked)
+    os.utime(linked, ns=(0, 10**9))
+
+    cache.get(SHA)
+    assert linked.stat().st_mtime_ns == 10**9
+
+
+def test_eviction_keeps_recently_hit_entries(tmp_path: Path):
+    cache = BlobCache(tmp_path / "blobs")
+    shas = []
+    for index in range(3):
+        content = f"prompt {index}".encode()
+        source = tmp_path / "source"
+        source.write_bytes(content)
+        shas.append(blob_sha(content))
+        cache.put(shas[-1], source)
+        entry = cache.get(shas[-1])
+        os.utime(entry, (index, index))
+
+    cache.get(shas[0])
+    evict_lru([cache], max_size=cache.size() - 1)
+    assert [cache.contains(sha) for sha in shas] == [True, False, True]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+import pytest
+
+from benchmarks.fake_github import FakeGitHub, FakeRepository
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+REPO = "bench/PromptHub"
+
+
+@pytest.fixture
+def fake_github() -> Iterator[Callable[[Dict[str, bytes]], FakeGitHub]]:
+    """Start a fake GitHub serving a repository with the given files"""
+    servers = []
+
+    def start(files: Dict[str, bytes]) -> FakeGitHub:
+        server = FakeGitHub(FakeRepository(REPO, files)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def git_mirror(tmp_path: Path) -> Callable[[Dict[str, bytes]], Path]:
+    """Commit the given files to a new local git repository"""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+
+    def create(files: Dict[str, bytes]) -> Path:
+        mirror = tmp_path / "mirror"
+        mirror.mkdir()
+        for path, content in files.items():
+            mirror.joinpath(path).parent.mkdir(parents=True, exist_ok=True)
+            mirror.joinpath(path).write_bytes(content)
+        git = ["git", "-C", str(mirror), "-c", "user.name=ssprompt", "-c", "user.email=ssprompt@example.com"]
+        subprocess.run([*git, "init", "--quiet"], check=True)
+        subprocess.run([*git, "add", "--all"], check=True)
+        subprocess.run([*git, "commit", "--quiet", "-m", "init"], check=True)
+        return mirror
+
+    return create
+
+
+def project_files(path: Path) -> Dict[str, bytes]:
+    """The pulled files below path, leaving out the pull manifest directory"""
+    return {
+        file.relative_to(path).as_posix(): file.read_bytes()
+        for file in path.rglob("*")
+        if file.is_file() and ".ssprompt" not in file.relative_to(path).parts
+    }
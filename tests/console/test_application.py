@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from cleo.testers.application_tester import ApplicationTester
+
+from ssprompt.console.application import Application
+
+
+@pytest.fixture
+def tester(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ApplicationTester:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("SSPROMPT_PROFILE", raising=False)
+    monkeypatch.setenv("SSPROMPT_CACHE_DIR", str(tmp_path / "cache"))
+    application = Application()
+    application.auto_exits(False)
+    return ApplicationTester(application)
+
+
+def test_profile_flag_before_the_command(tester: ApplicationTester, tmp_path: Path):
+    assert tester.execute("--profile about") == 0
+    assert tmp_path.joinpath("ssprompt-about.prof").is_file()
+
+
+def test_profile_output(tester: ApplicationTester, tmp_path: Path):
+    assert tester.execute("--profile-output out.prof about") == 0
+    assert tmp_path.joinpath("out.prof").is_file()
+    assert not tmp_path.joinpath("ssprompt-about.prof").exists()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from cleo.testers.application_tester import ApplicationTester
+
+from ssprompt.console.application import Application
+from tests.conftest import REPO
+
+PROJECT = {
+    "example/example.yaml": b"meta: {}\n",
+    "example/json/example/a.json": b"{}",
+    "example/text/b.txt": b"prompt",
+}
+
+PULL_LIST = f"""\
+project: {REPO}
+prompts:
+  - subproject: example
+    types: json
+    path: prompts
+  - subproject: example
+    types: text
+    path: prompts
+  - subproject: example
+    path: others
+"""
+
+
+@pytest.fixture
+def tester(fake_github, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    server = fake_github(PROJECT)
+    monkeypatch.setattr(
+        "ssprompt.console.commands.pull.GitPromptHub", server.hub_class()
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SSPROMPT_CACHE_DIR", str(tmp_path / "cache"))
+    application = Application()
+    application.auto_exits(False)
+    return ApplicationTester(application)
+
+
+def test_dry_run_of_pull_list(tester: ApplicationTester, tmp_path: Path):
+    tmp_path.joinpath("prompts.yaml").write_text(PULL_LIST)
+    assert (
+        tester.execute("pull --from prompts.yaml --dry-run --stats-json plans.json")
+        == 0
+    )
+    assert not tmp_path.joinpath("prompts").exists()
+    assert not tmp_path.joinpath("others").exists()
+
+    reports = json.loads(tmp_path.joinpath("plans.json").read_text())
+    assert sorted(report["download"]["files"] for report in reports.values()) == [1, 1, 3]
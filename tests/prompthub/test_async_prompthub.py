@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from ssprompt.core.prompthub import AsyncGitPromptHub
+from ssprompt.core.prompthub.manifest import Manifest
+from tests.conftest import REPO, project_files
+
+PROJECT = {
+    "example/example.yaml": b"meta: {}\n",
+    "example/json/a.json": b"{}",
+    "example/json/b.json": b"{}",
+    "example/text/c.txt": b"prompt",
+}
+
+
+def async_hub(server, path: Path, sync_hub=None, **kwargs) -> AsyncGitPromptHub:
+    class FakeAsyncGitPromptHub(AsyncGitPromptHub):
+        hub_class = sync_hub or server.hub_class()
+
+    return FakeAsyncGitPromptHub("github", REPO, "example", "", path=path, **kwargs)
+
+
+@pytest.mark.parametrize("mode", ["tree", "contents", "archive"])
+def test_pull_project(fake_github, tmp_path: Path, mode):
+    server = fake_github(PROJECT)
+    hub = async_hub(server, tmp_path, mode=mode, jobs=2)
+    asyncio.run(hub.pull_project())
+    assert project_files(tmp_path / "example") == {
+        path[len("example/") :]: content for path, content in PROJECT.items()
+    }
+    # contents 接口不对应提交, 只有目录树与压缩包拉取会记录提交
+    manifest = Manifest.load(tmp_path / "example", REPO, "example")
+    expected = None if mode == "contents" else server.repository.head[0]
+    assert manifest.commit == expected
+
+
+def test_incremental_pull(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    asyncio.run(async_hub(server, tmp_path).pull_project())
+    files = dict(PROJECT)
+    files["example/text/c.txt"] = b"new prompt"
+    del files["example/json/b.json"]
+    server.repository.commit(files)
+
+    hub = async_hub(server, tmp_path)
+    asyncio.run(hub.pull_project())
+    assert project_files(tmp_path / "example") == {
+        path[len("example/") :]: content for path, content in files.items()
+    }
+    assert hub.hub.pull_stats.report()["files"]["fetched"] == 1
+
+
+def test_failed_task_waits_for_running_tasks(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    server.latency = 0.05
+    events = []
+
+    def failing_task():
+        raise RuntimeError("failed task")
+
+    def recorded(task):
+        task()
+        events.append("landed")
+
+    class RecordingHub(server.hub_class()):
+        def prepare_pull(self, plan):
+            tasks = super().prepare_pull(plan)
+            return [failing_task] + [partial(recorded, task) for task in tasks]
+
+        def finish_pull(self, succeeded):
+            events.append("finish")
+            super().finish_pull(succeeded)
+
+    hub = async_hub(server, tmp_path, sync_hub=RecordingHub, mode="tree", jobs=4)
+    with pytest.raises(RuntimeError):
+        asyncio.run(hub.pull_project())
+    # 收尾必须在所有已启动的下载线程结束之后
+    assert "landed" in events
+    assert events[-1] == "finish"
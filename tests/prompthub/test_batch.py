@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_project
+from ssprompt.core.prompthub.batch import BatchPull
+from tests.conftest import REPO, project_files
+
+PROJECT = {
+    "example/example.yaml": synthetic_project(1, sub_project="example")[
+        "example/example.yaml"
+    ],
+    **{f"example/json/example/{i}.json": b"%d" % i for i in range(20)},
+    **{f"example/text/example/{i}.txt": b"text %d" % i for i in range(20)},
+}
+
+
+def batch_pull(server, path: Path):
+    with BatchPull(4) as batch:
+        hubs = [
+            server.hub_class()(
+                "github", REPO, "example", "", types, path=path, **batch.shared
+            )
+            for types in ("json", "text")
+        ]
+        return hubs, batch.run(hubs)
+
+
+def test_entries_sharing_a_directory(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    server.latency = 0.01
+    _, (_, failures) = batch_pull(server, tmp_path)
+    assert failures == {}
+    files = project_files(tmp_path / "example")
+    assert len([path for path in files if path.endswith(".json")]) == 20
+    assert len([path for path in files if path.endswith(".txt")]) == 20
+
+
+def test_failures_of_the_same_sub_project(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    server.fail("/git/trees/", 404, times=2)
+    hubs, (_, failures) = batch_pull(server, tmp_path)
+    assert sorted(failures) == sorted(BatchPull.label(hub) for hub in hubs)
+    assert len(failures) == 2
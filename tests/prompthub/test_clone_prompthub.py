@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from ssprompt.core.prompthub import CloneGitPromptHub
+from ssprompt.core.prompthub.manifest import Manifest
+from tests.conftest import REPO, project_files
+
+PROJECT = {
+    "example/example.yaml": b"meta: {}\n",
+    "example/json/a.json": b"{}",
+    "example/text/b.txt": b"prompt",
+    "other/other.yaml": b"meta: {other: true}\n",
+}
+
+
+@pytest.fixture
+def clone_url(git_mirror) -> str:
+    mirror = git_mirror(PROJECT)
+    # file:// 协议下部分克隆需要服务端允许过滤
+    subprocess.run(
+        ["git", "-C", str(mirror), "config", "uploadpack.allowFilter", "true"], check=True
+    )
+    return mirror.as_uri()
+
+
+def clone_hub(clone_url: str, path: Path) -> CloneGitPromptHub:
+    path.mkdir(exist_ok=True)
+    return CloneGitPromptHub(
+        "github", REPO, "example", "", path=path, clone_url=clone_url
+    )
+
+
+def missing_blobs(hub: CloneGitPromptHub) -> int:
+    output = subprocess.run(
+        ["git", "-C", str(hub._mirror), "rev-list", "--objects", "--missing=print", "--all"],
+        capture_output=True,
+        check=True,
+    ).stdout
+    return sum(1 for line in output.splitlines() if line.startswith(b"?"))
+
+
+def test_pull_project(clone_url: str, tmp_path: Path):
+    hub = clone_hub(clone_url, tmp_path)
+    try:
+        hub.pull_project()
+        # 稀疏检出只拉取工程目录下的 Blob
+        assert missing_blobs(hub) == 1
+    finally:
+        hub.close()
+    assert project_files(tmp_path / "example") == {
+        "example.yaml": b"meta: {}\n",
+        "json/a.json": b"{}",
+        "text/b.txt": b"prompt",
+    }
+    manifest = Manifest.load(tmp_path / "example", REPO, "example")
+    assert manifest.commit is not None
+
+
+def test_dry_run_transfers_no_blob(clone_url: str, tmp_path: Path):
+    hub = clone_hub(clone_url, tmp_path)
+    try:
+        plan = hub.plan_pull()
+        assert sorted(item["path"] for item in plan.download) == [
+            "example.yaml",
+            "json/a.json",
+            "text/b.txt",
+        ]
+        assert missing_blobs(hub) == len(PROJECT)
+    finally:
+        hub.close()
+    assert not (tmp_path / "example").exists()
+
+
+def test_unchanged_remote_is_not_cloned(clone_url: str, tmp_path: Path):
+    hub = clone_hub(clone_url, tmp_path)
+    hub.pull_project()
+    hub.close()
+
+    hub = clone_hub(clone_url, tmp_path)
+    try:
+        hub.pull_project()
+        assert not any(hub._mirror.iterdir())
+    finally:
+        hub.close()
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import synthetic_project
+from ssprompt.core.cache import BlobCache, HttpCache
+from ssprompt.core.http import RequestScheduler
+from ssprompt.core.prompthub.git_prompthub import DEFAULT_JOBS
+from ssprompt.core.prompthub.manifest import MANIFEST_DIR, Manifest
+from ssprompt.utils.githash import blob_sha
+from tests.conftest import REPO, project_files
+
+# 内容相同的文件共用一个 Blob
+DUPLICATED = {
+    **{f"example/pkg{i}/__init__.py": b"" for i in range(16)},
+    **{f"example/prompt{i}.txt": b"same prompt" for i in range(16)},
+    "example/example.yaml": b"meta: {}\n",
+}
+
+
+def expected_files(files, sub_project="example"):
+    prefix = sub_project + "/"
+    return {path[len(prefix) :]: content for path, content in files.items()}
+
+
+@pytest.mark.parametrize("mode", ["tree", "contents", "archive"])
+@pytest.mark.parametrize("cached", [False, True])
+def test_pull_files_with_same_content(fake_github, tmp_path: Path, mode, cached):
+    server = fake_github(DUPLICATED)
+    blob_cache = BlobCache(tmp_path / "blobs") if cached else None
+    for target in ("first", "second"):
+        path = tmp_path / target
+        path.mkdir()
+        hub = server.hub_class()(
+            "github", REPO, "example", "", path=path, mode=mode, blob_cache=blob_cache
+        )
+        hub.pull_project()
+        assert project_files(path / "example") == expected_files(DUPLICATED)
+        assert not (path / "example" / MANIFEST_DIR / "partial").exists()
+
+
+PROJECT = {
+    "example/example.yaml": b"meta: {}\n",
+    "example/json/a.json": b"{}",
+    "example/json/b.json": b"[]",
+    "example/text/c.txt": b"prompt",
+}
+
+
+def pull(server, path: Path, **kwargs):
+    path.mkdir(exist_ok=True)
+    kwargs.setdefault("mode", "tree")
+    hub = server.hub_class()(
+        "github",
+        REPO,
+        "example",
+        "",
+        path=path,
+        scheduler=RequestScheduler(DEFAULT_JOBS, 0),
+        **kwargs,
+    )
+    hub.pull_project()
+    return hub
+
+
+def test_failed_download_is_retried_by_the_next_pull(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    server.fail("example/json/a.json", 500)
+    with pytest.raises(ValueError, match="json/a.json"):
+        pull(server, tmp_path)
+    assert Manifest.load(tmp_path / "example", REPO, "example").commit is None
+
+    pull(server, tmp_path)
+    assert project_files(tmp_path / "example") == expected_files(PROJECT)
+
+
+def test_failed_tree_listing_is_retried_by_the_next_pull(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    server.fail("/git/trees/", 500)
+    with pytest.raises(ValueError):
+        pull(server, tmp_path)
+
+    pull(server, tmp_path)
+    assert project_files(tmp_path / "example") == expected_files(PROJECT)
+
+
+def test_full_listing_removes_files_deleted_upstream(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    pull(server, tmp_path)
+    files = dict(PROJECT)
+    del files["example/json/b.json"]
+    server.repository.commit(files)
+    # compare 接口失败时退回完整的目录树
+    server.fail("/compare/", 404)
+
+    pull(server, tmp_path)
+    assert project_files(tmp_path / "example") == expected_files(files)
+    manifest = Manifest.load(tmp_path / "example", REPO, "example")
+    assert "json/b.json" not in manifest.files
+    assert manifest.commit == server.repository.head[0]
+
+
+def test_linked_cache_restores_upstream_content(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    blob_cache = BlobCache(tmp_path / "blobs", link=True)
+    pull(server, tmp_path / "a", blob_cache=blob_cache)
+    pull(server, tmp_path / "b", blob_cache=blob_cache)
+    manifest = Manifest.load(tmp_path / "a" / "example", REPO, "example")
+    # 缓存命中不能改变已链接工程文件的修改时间
+    for relative_path, entry in manifest.files.items():
+        assert manifest.is_unchanged(
+            relative_path, tmp_path / "a" / "example" / relative_path, entry.sha
+        )
+
+    with open(tmp_path / "a" / "example" / "text" / "c.txt", "r+b") as file:
+        file.write(b"edited")
+    pull(server, tmp_path / "c", blob_cache=blob_cache)
+    assert project_files(tmp_path / "c" / "example") == expected_files(PROJECT)
+
+
+def test_archive_pull_counts_transferred_bytes(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    hub = pull(server, tmp_path, mode="archive")
+    assert project_files(tmp_path / "example") == expected_files(PROJECT)
+    report = hub.pull_stats.report()
+    assert report["bytes"]["transferred"] == len(server.repository.tarball("main"))
+
+
+def test_offline_pull_after_incremental_pull(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    caches = {
+        "blob_cache": BlobCache(tmp_path / "blobs"),
+        "http_cache": HttpCache(tmp_path / "http"),
+    }
+    pull(server, tmp_path / "a", **caches)
+    files = {**PROJECT, "example/text/c.txt": b"changed", "example/text/d.txt": b"new"}
+    server.repository.commit(files)
+    # 增量拉取只请求 compare 接口, 不获取完整的目录树
+    pull(server, tmp_path / "a", **caches)
+    tree_url = server.endpoints["tree"].format(
+        repo_url=REPO, sha=server.repository.head[0]
+    )
+    assert not caches["http_cache"].contains(tree_url)
+
+    # 新目录没有清单, 离线时从缓存的目录树列出文件
+    pull(server, tmp_path / "b", offline=True, **caches)
+    assert project_files(tmp_path / "b" / "example") == expected_files(files)
+
+
+def test_remote_meta_is_retried_by_the_scheduler_only(fake_github, tmp_path: Path):
+    server = fake_github(synthetic_project(2, sub_project="example"))
+    hub = server.hub_class()(
+        "github",
+        REPO,
+        "example",
+        "",
+        path=tmp_path,
+        scheduler=RequestScheduler(DEFAULT_JOBS, 2, 0),
+    )
+    server.fail("example.yaml", 500, times=3)
+    before = server.requests
+    assert hub.get_remote_project_meta() is None
+    assert server.requests - before == 3
+    assert hub.get_remote_project_meta() is not None
+
+
+def test_incremental_pull_after_rewritten_history(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    base = server.repository.head[0]
+    server.repository.commit({**PROJECT, "example/text/c.txt": b"amended"})
+    pull(server, tmp_path)
+    # 强制推送: 新提交不包含上次拉取的提交
+    files = {**PROJECT, "example/json/a.json": b"{\"a\": 1}"}
+    server.repository.commit(files, parent=base)
+
+    pull(server, tmp_path)
+    assert project_files(tmp_path / "example") == expected_files(files)
+
+
+@pytest.mark.parametrize("mode", ["tree", "contents"])
+def test_pull_files_with_url_characters(fake_github, tmp_path: Path, mode):
+    files = {
+        "example/example.yaml": b"meta: {}\n",
+        "example/notes #1.txt": b"notes",
+        "example/100%25.txt": b"percent",
+        "example/why?/a b.txt": b"question",
+    }
+    server = fake_github(files)
+    pull(server, tmp_path, mode=mode)
+    assert project_files(tmp_path / "example") == expected_files(files)
+
+
+def test_pull_types_into_the_same_directory(fake_github, tmp_path: Path):
+    files = {
+        "example/example.yaml": b"meta: {}\n",
+        "example/json/example/a.json": b"{}",
+        "example/text/b.txt": b"prompt",
+    }
+    server = fake_github(files)
+    for types in ("json", "text"):
+        pull(server, tmp_path, types=types)
+    head = server.repository.head[0]
+    for directory in ("example/json/example", "example/text"):
+        assert Manifest.load(tmp_path / "example", REPO, directory).commit == head
+
+    server.repository.commit({**files, "example/json/example/a.json": b"[]"})
+    # 每种类型保留各自的清单, 再次拉取时仍可增量列出文件
+    server.fail("/git/trees/", 404)
+    pull(server, tmp_path, types="json")
+    assert (tmp_path / "example" / "a.json").read_bytes() == b"[]"
+
+
+def test_offline_pull_fails_before_writing_without_cached_metafile(
+    fake_github, tmp_path: Path
+):
+    server = fake_github(PROJECT)
+    caches = {
+        "blob_cache": BlobCache(tmp_path / "blobs"),
+        "http_cache": HttpCache(tmp_path / "http"),
+    }
+    # 只拉取文件, 没有读取远端 metafile
+    pull(server, tmp_path / "a", types="json", **caches)
+    with pytest.raises(ValueError, match="metafile"):
+        pull(server, tmp_path / "b", types="json", offline=True, **caches)
+    assert project_files(tmp_path / "b" / "example") == {}
+
+
+def test_resume_partial_download(fake_github, tmp_path: Path):
+    content = bytes(range(256)) * 64
+    files = {**PROJECT, "example/data.bin": content}
+    server = fake_github(files)
+    partial_dir = tmp_path / "example" / MANIFEST_DIR / "partial"
+    partial_dir.mkdir(parents=True)
+    partial_dir.joinpath(blob_sha(content) + ".part").write_bytes(content[:4096])
+
+    hub = pull(server, tmp_path)
+    assert project_files(tmp_path / "example") == expected_files(files)
+    assert hub.pull_stats.report()["bytes"]["transferred"] < sum(map(len, files.values()))
+
+
+def test_pull_leaves_eviction_to_the_caller(fake_github, tmp_path: Path):
+    server = fake_github(PROJECT)
+    blob_cache = BlobCache(tmp_path / "blobs", max_size=1)
+    pull(server, tmp_path / "a", blob_cache=blob_cache)
+    # 淘汰由拉取结束后对所有缓存的一次 evict_lru 完成
+    assert len(blob_cache.entries()) == len(set(PROJECT.values()))
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from ssprompt.core.prompthub import LocalGitPromptHub
+from tests.conftest import REPO, project_files
+
+
+def test_pull_files_with_same_content(git_mirror, tmp_path: Path):
+    files = {"example/a/__init__.py": b"", "example/b/__init__.py": b""}
+    mirror = git_mirror(files)
+    path = tmp_path / "project"
+    path.mkdir()
+    LocalGitPromptHub(REPO, "example", mirror, path=path).pull_project()
+    assert project_files(path / "example") == {"a/__init__.py": b"", "b/__init__.py": b""}